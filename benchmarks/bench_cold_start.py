@@ -0,0 +1,61 @@
+"""
+Cold-Start Benchmark
+
+Measures how long a fresh process takes to build the OCR engine from
+scratch and to restore it from the warm-start snapshot. Every sample runs
+in a new interpreter, as the one-shot text-extractor command does.
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from text_extractor import snapshot
+
+
+LOAD_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from text_extractor import snapshot
+imported = time.perf_counter()
+engine, restored = snapshot.load_engine(use_snapshot={use_snapshot}, snapshot_dir=sys.argv[1])
+loaded = time.perf_counter()
+print(imported - start, loaded - imported, restored)
+"""
+
+
+def sample(use_snapshot: bool, snapshot_dir: str):
+    output = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT.format(use_snapshot=use_snapshot), snapshot_dir],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(output[0]), float(output[1]), output[2] == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        snapshot.create_snapshot(snapshot_dir)
+
+        print(f"{'mode':<12}  {'import (s)':>10}  {'engine median (s)':>18}  {'min (s)':>8}")
+        for label, use_snapshot in (("scratch", False), ("snapshot", True)):
+            imports, loads = [], []
+            for _ in range(args.runs):
+                import_time, load_time, restored = sample(use_snapshot, snapshot_dir)
+                assert restored == use_snapshot
+                imports.append(import_time)
+                loads.append(load_time)
+            print(f"{label:<12}  {statistics.median(imports):>10.3f}  "
+                  f"{statistics.median(loads):>18.3f}  {min(loads):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
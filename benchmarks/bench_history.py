@@ -0,0 +1,70 @@
+"""
+Capture History Benchmark
+
+Fills a throwaway history database with synthetic captures through
+HistoryStore.add() and times searches for common and rare words, so the
+"milliseconds after hundreds of thousands of captures" target can be
+checked.
+
+Usage:
+    python -m benchmarks.bench_history [n_captures]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from text_extractor.history import HistoryStore
+
+
+WORDS = (
+    "invoice total amount due date customer order number payment received "
+    "shipping address account balance report summary meeting notes error "
+    "warning failed build test passed commit branch merge request review"
+).split()
+
+QUERIES = ["invoice", "invoice total", "payment received", "zebra", "quasar nebula"]
+
+
+def make_text(rng: random.Random) -> str:
+    lines = [" ".join(rng.choices(WORDS, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 8))]
+    if rng.random() < 0.001:
+        lines.append("quasar nebula")
+    return "\n".join(lines)
+
+
+def fill(store: HistoryStore, n_captures: int) -> None:
+    rng = random.Random(0)
+    for i in range(n_captures):
+        store.add(make_text(rng), [], f"{i:064x}", created_at=float(i))
+    store.flush()
+
+
+def time_ms(store: HistoryStore, query: str, repeat: int = 20) -> float:
+    store.search(query)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store.search(query)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def main():
+    n_captures = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        with HistoryStore(Path(tmp) / "history.db", batch_size=1000) as store:
+            start = time.perf_counter()
+            fill(store, n_captures)
+            print(f"Inserted {n_captures} captures in {time.perf_counter() - start:.1f} s")
+
+            print(f"{'query':<20}  {'results':>7}  {'median (ms)':>11}")
+            for query in QUERIES:
+                results = len(store.search(query))
+                print(f"{query:<20}  {results:>7}  {time_ms(store, query):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Latency Benchmark
+
+Measures per-capture OCR latency on randomly sized crops of the sample
+images, with and without shape bucketing. Each mode uses a freshly loaded
+engine and runs the same crops in the same order; the bucketed engine is
+warmed first, as the CLI does while the user selects an area.
+
+Every crop is run twice. The second run has all its shapes warm, so the
+difference ("excess") is the time spent on shapes the engine had not seen
+yet, separated from the cost of the OCR work itself.
+
+Usage:
+    python -m benchmarks.bench_latency [--captures N] [--seed S]
+"""
+
+import argparse
+import glob
+import random
+import statistics
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from text_extractor import backend, shapes, snapshot
+
+
+def random_crops(count: int, seed: int):
+    rng = random.Random(seed)
+    images = [cv2.imread(path) for path in sorted(glob.glob("images/*.png"))]
+    crops = []
+    for _ in range(count):
+        image = rng.choice(images)
+        height, width = image.shape[:2]
+        crop_height = rng.randint(min(40, height), height)
+        crop_width = rng.randint(min(80, width), width)
+        y = rng.randint(0, height - crop_height)
+        x = rng.randint(0, width - crop_width)
+        crops.append(np.ascontiguousarray(image[y:y + crop_height, x:x + crop_width]))
+    return crops
+
+
+def run(crops, bucketed: bool, snapshot_dir: str):
+    engine, _ = snapshot.load_engine(snapshot_dir=snapshot_dir)
+    warm_time = 0.0
+    if bucketed:
+        shapes.enable_shape_buckets(engine)
+        start = time.perf_counter()
+        shapes.warm_up(engine)
+        warm_time = time.perf_counter() - start
+
+    latencies, excess = [], []
+    for crop in crops:
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            backend.extract_result_from_array(crop, engine, with_boxes=False)
+            timings.append(time.perf_counter() - start)
+        latencies.append(timings[0])
+        excess.append(timings[0] - timings[1])
+    return latencies, excess, warm_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--captures", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    crops = random_crops(args.captures, args.seed)
+
+    print(f"{'mode':<10}  {'warm-up (s)':>11}  {'p50 (ms)':>9}  {'p99 (ms)':>9}  "
+          f"{'excess p50 (ms)':>15}  {'excess p99 (ms)':>15}")
+    # Engines restore from a snapshot, as on every run after the first,
+    # kept in a temporary directory so the user's cache is left alone
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        snapshot.create_snapshot(snapshot_dir)
+        for label, bucketed in (("exact", False), ("bucketed", True)):
+            latencies, excess, warm_time = run(crops, bucketed, snapshot_dir)
+            quantiles = statistics.quantiles(latencies, n=100)
+            excess_quantiles = statistics.quantiles(excess, n=100)
+            print(f"{label:<10}  {warm_time:>11.2f}  {quantiles[49] * 1000:>9.0f}  "
+                  f"{quantiles[98] * 1000:>9.0f}  {excess_quantiles[49] * 1000:>15.0f}  "
+                  f"{excess_quantiles[98] * 1000:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
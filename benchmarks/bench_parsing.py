@@ -0,0 +1,90 @@
+"""
+Result Parsing Benchmark
+
+Compares the per-item extract_text_conf() loop that extract_text_from_image
+used to run against parse_ocr_result(), which runs the same loop and adds
+the cost of building the columnar OCRResult, on synthetic RapidOCR results
+of increasing size. A second table compares filtering parsed lines by
+confidence in Python against the vectorized OCRResult.filter().
+
+Usage:
+    python -m benchmarks.bench_parsing
+"""
+
+import random
+import timeit
+from itertools import compress
+
+from text_extractor.backend import extract_text_conf, parse_ocr_result
+
+
+MIN_CONFIDENCE = 0.6
+
+SIZES = (5, 10, 20, 100, 500, 2000)
+
+
+def make_result(n_lines: int):
+    """Builds a fake RapidOCR result in its [box, text, score] layout."""
+    rng = random.Random(0)
+    result = []
+    for i in range(n_lines):
+        x, y = rng.uniform(0, 1500), i * 20.0
+        box = [[x, y], [x + 300.0, y], [x + 300.0, y + 18.0], [x, y + 18.0]]
+        result.append([box, f"line {i} of some screenshot text", rng.random()])
+    return result
+
+
+def parse_per_item(result):
+    text_lines = []
+    text_conf_pairs = []
+    for item in result:
+        text, confidence = extract_text_conf(item)
+        if text is None:
+            continue
+        confidence = confidence if confidence is not None else 0.0
+        if confidence < MIN_CONFIDENCE:
+            continue
+        text_lines.append(text)
+        text_conf_pairs.append((text, confidence))
+    return '\n'.join(text_lines), text_conf_pairs
+
+
+def parse_columnar(result, with_boxes):
+    parsed = parse_ocr_result(result, with_boxes, MIN_CONFIDENCE)
+    return '\n'.join(parsed.texts), list(zip(parsed.texts, parsed.scores.tolist()))
+
+
+def filter_lists(texts, scores):
+    keep = [score >= MIN_CONFIDENCE for score in scores]
+    return list(compress(texts, keep)), list(compress(scores, keep))
+
+
+def time_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    print(f"{'lines':>6}  {'per-item':>10}  {'text only':>10}  {'ratio':>8}  "
+          f"{'w/ boxes':>10}  {'ratio':>8}   (microseconds per result)")
+    for n_lines in SIZES:
+        result = make_result(n_lines)
+        number = max(1, 20000 // n_lines)
+        per_item = time_us(lambda: parse_per_item(result), number)
+        text_only = time_us(lambda: parse_columnar(result, False), number)
+        with_boxes = time_us(lambda: parse_columnar(result, True), number)
+        print(f"{n_lines:>6}  {per_item:>10.1f}  {text_only:>10.1f}  "
+              f"{per_item / text_only:>7.2f}x  {with_boxes:>10.1f}  {per_item / with_boxes:>7.2f}x")
+
+    print(f"\n{'lines':>6}  {'lists':>10}  {'filter()':>10}  {'speedup':>8}   "
+          f"(microseconds to filter a parsed result)")
+    for n_lines in SIZES:
+        parsed = parse_ocr_result(make_result(n_lines))
+        scores = parsed.scores.tolist()
+        number = max(1, 20000 // n_lines)
+        lists = time_us(lambda: filter_lists(parsed.texts, scores), number)
+        vectorized = time_us(lambda: parsed.filter(MIN_CONFIDENCE), number)
+        print(f"{n_lines:>6}  {lists:>10.1f}  {vectorized:>10.1f}  {lists / vectorized:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import backend
+from text_extractor.backend import OCRResult, parse_ocr_result
+
+
+BOX_A = [[0.0, 0.0], [10.0, 0.0], [10.0, 5.0], [0.0, 5.0]]
+BOX_B = [[0.0, 10.0], [20.0, 10.0], [20.0, 15.0], [0.0, 15.0]]
+
+
+def test_box_text_score_layout():
+    parsed = parse_ocr_result([[BOX_A, "hello", 0.9], [BOX_B, "world", 0.4]])
+
+    assert parsed.texts == ["hello", "world"]
+    assert parsed.scores.dtype == np.float32
+    np.testing.assert_allclose(parsed.scores, [0.9, 0.4])
+    assert parsed.boxes.shape == (2, 4, 2)
+    np.testing.assert_array_equal(parsed.boxes[1], BOX_B)
+
+
+def test_box_pair_layout():
+    parsed = parse_ocr_result([(BOX_A, ("hello", 0.9)), (BOX_B, ("world", 0.4))])
+
+    assert parsed.texts == ["hello", "world"]
+    np.testing.assert_allclose(parsed.scores, [0.9, 0.4])
+    np.testing.assert_array_equal(parsed.boxes[0], BOX_A)
+
+
+def test_generic_fallback():
+    result = [(BOX_A, "hello"), ["nested", 0.7, "extra", 1], (BOX_B, None, None)]
+    parsed = parse_ocr_result(result)
+
+    # Items without text are dropped; missing boxes and scores become zeros
+    assert parsed.texts == ["hello", "nested"]
+    np.testing.assert_allclose(parsed.scores, [0.0, 0.7])
+    np.testing.assert_array_equal(parsed.boxes[0], BOX_A)
+    np.testing.assert_array_equal(parsed.boxes[1], np.zeros((4, 2)))
+
+
+def test_generic_fallback_without_text():
+    parsed = parse_ocr_result([(BOX_A, None, None)])
+
+    assert parsed.texts == []
+    assert parsed.boxes.shape == (0, 4, 2)
+
+
+@pytest.mark.parametrize("result", [None, []])
+def test_empty_result(result):
+    parsed = parse_ocr_result(result)
+
+    assert parsed.texts == []
+    assert parsed.scores.shape == (0,)
+    assert parsed.boxes.shape == (0, 4, 2)
+
+    # Like a non-empty result, an empty one has no boxes unless asked for
+    assert parse_ocr_result(result, with_boxes=False).boxes is None
+    assert parse_ocr_result([[BOX_A, "low", 0.1]], False, min_confidence=0.5).boxes is None
+
+
+def test_without_boxes():
+    parsed = parse_ocr_result([[BOX_A, "hello", 0.9]], with_boxes=False)
+
+    assert parsed.boxes is None
+    assert parsed.texts == ["hello"]
+    with pytest.raises(ValueError):
+        parsed.to_lines()
+
+
+def test_min_confidence_matches_filter():
+    result = [[BOX_A, "keep", 0.9], [BOX_B, "drop", 0.4], [BOX_A, "edge", 0.5]]
+
+    filtered = parse_ocr_result(result, min_confidence=0.5)
+    assert filtered.texts == ["keep", "edge"]
+    np.testing.assert_allclose(filtered.scores, [0.9, 0.5])
+    assert filtered.boxes.shape == (2, 4, 2)
+
+    assert parse_ocr_result(result).filter(0.5).texts == filtered.texts
+    assert parse_ocr_result(result, min_confidence=0.95).texts == []
+
+
+def test_filter():
+    result = OCRResult(
+        np.array([BOX_A, BOX_B], dtype=np.float32),
+        np.array([0.9, 0.4], dtype=np.float32),
+        ["hello", "world"]
+    )
+
+    assert result.filter(0.0) is result
+    kept = result.filter(0.5)
+    assert kept.texts == ["hello"]
+    np.testing.assert_array_equal(kept.boxes, [BOX_A])
+    assert result.filter(1.0).texts == []
+
+    no_boxes = result._replace(boxes=None).filter(0.5)
+    assert no_boxes.boxes is None
+    assert no_boxes.texts == ["hello"]
+
+
+def test_to_lines():
+    lines = parse_ocr_result([[BOX_A, "hello", 0.5]]).to_lines()
+
+    assert lines == [(BOX_A, "hello", 0.5)]
+
+
+@pytest.fixture(scope="module")
+def ocr_engine():
+    return RapidOCR()
+
+
+def test_region_views_clip_and_drop():
+    image = np.zeros((100, 200), dtype=np.uint8)
+    regions = [(-10, -20, 50, 40), (150, 80, 100, 100), (300, 0, 10, 10), (10, 10, 0, 5)]
+
+    views = backend.region_views(image, regions)
+
+    # Out-of-bounds parts are clipped; regions left empty are dropped
+    assert [region for region, _ in views] == [(0, 0, 40, 20), (150, 80, 50, 20)]
+    assert [view.shape for _, view in views] == [(20, 40), (20, 50)]
+
+
+def test_region_views_are_views():
+    image = np.arange(100 * 200, dtype=np.uint32).reshape(100, 200)
+
+    (region, view), = backend.region_views(image, [(20, 30, 40, 10)])
+
+    assert view.base is not None
+    assert np.shares_memory(view, image)
+    assert view[0, 0] == image[30, 20]
+
+
+@pytest.mark.parametrize("region", [(0, 0, 10), (0, 0, 10, 10, 10), ()])
+def test_region_views_reject_malformed(region):
+    with pytest.raises(ValueError):
+        backend.region_views(np.zeros((10, 10), dtype=np.uint8), [region])
+
+
+def test_regions_map_to_image_coordinates(ocr_engine):
+    full = backend.extract_lines_from_image("images/test7.png", ocr_engine)
+
+    # The lower paragraph, plus a region reaching past the top-left corner
+    lines = backend.extract_lines_from_regions(
+        "images/test7.png", [(0, 70, 394, 108), (-50, -50, 500, 110)], ocr_engine
+    )
+    texts = [text for _, text, _ in lines]
+
+    # Small regions are upscaled, so the detector splits them into words
+    split = texts.index("This")
+    assert texts[:3] == ["The", "quick", "brown"]
+    assert texts[-1] == "format."
+    for index, (box, text, _) in enumerate(lines):
+        box = np.array(box)
+        if index < split:
+            assert box[:, 1].min() >= 70
+        else:
+            assert box[:, 1].max() <= 60
+
+        # Each word lies inside a line found by OCR of the full image
+        center_x, center_y = box.mean(axis=0)
+        assert any(
+            full_box[:, 0].min() <= center_x <= full_box[:, 0].max()
+            and full_box[:, 1].min() <= center_y <= full_box[:, 1].max()
+            for full_box in (np.array(full_box) for full_box, _, _ in full)
+        ), text
+
+
+def test_regions_without_text(ocr_engine):
+    # The blank band between the paragraphs, and a region off the image
+    for region in [(0, 60, 394, 16), (500, 500, 10, 10)]:
+        assert backend.extract_lines_from_regions("images/test7.png", [region], ocr_engine) == []
@@ -0,0 +1,149 @@
+import random
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from text_extractor import history
+
+
+BOX = [[0.0, 0.0], [10.0, 0.0], [10.0, 5.0], [0.0, 5.0]]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "history.db"
+
+
+def count_rows(db_path, table="captures"):
+    with sqlite3.connect(str(db_path)) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_add_is_batched(db_path):
+    with history.HistoryStore(db_path, batch_size=2) as store:
+        store.add("first", [(BOX, "first", 0.9)], "h1")
+        assert count_rows(db_path) == 0
+
+        store.add("second", [(BOX, "second", 0.8)], "h2")
+        assert count_rows(db_path) == 2
+        assert count_rows(db_path, "captures_fts") == 2
+
+        store.add("third", [], "h3")
+
+    # Closing flushes the rest
+    assert count_rows(db_path) == 3
+
+
+def test_search_and_get(db_path):
+    with history.HistoryStore(db_path) as store:
+        store.add("Invoice total 3.75miles", [(BOX, "Invoice total 3.75miles", 0.9)], "h1",
+                  created_at=100.0)
+        store.add("Unrelated capture", [], "h2")
+
+        results = store.search("invoice")
+        assert [capture.text for capture in results] == ["Invoice total 3.75miles"]
+
+        capture = store.get(results[0].id)
+        assert capture.created_at == 100.0
+        assert capture.image_hash == "h1"
+        assert capture.lines == [(BOX, "Invoice total 3.75miles", 0.9)]
+
+        assert store.get(12345) is None
+        assert store.find_by_hash("h2").text == "Unrelated capture"
+        assert store.find_by_hash("missing") is None
+
+
+def test_search_returns_newest_first(db_path):
+    with history.HistoryStore(db_path) as store:
+        for i in range(5):
+            store.add(f"invoice {i}", [], f"h{i}")
+        store.add("unrelated", [], "h5")
+
+        assert [c.text for c in store.search("invoice", limit=3)] == [
+            "invoice 4", "invoice 3", "invoice 2"
+        ]
+
+
+def test_search_requires_all_words(db_path):
+    with history.HistoryStore(db_path) as store:
+        store.add("alpha beta", [], "h1")
+        store.add("alpha gamma", [], "h2")
+
+        assert [c.text for c in store.search("alpha gamma")] == ["alpha gamma"]
+        assert store.search("   ") == []
+
+
+@pytest.mark.parametrize("query", ['"quoted', "NOT AND OR", "col:value", "near(a b)", "x* ^y"])
+def test_search_treats_query_literally(db_path, query):
+    with history.HistoryStore(db_path) as store:
+        store.add(f"before {query} after", [], "h1")
+        store.add("something else", [], "h2")
+
+        # FTS5 syntax in the query must neither raise nor match everything
+        assert len(store.search(query)) <= 1
+
+
+def test_concurrent_flushes_index_each_row_once(db_path):
+    history.HistoryStore(db_path).close()
+
+    class RaceConnection:
+        """Lets another process flush right after the last id is read."""
+
+        def __init__(self, conn):
+            self._conn = conn
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+        def __enter__(self):
+            return self._conn.__enter__()
+
+        def __exit__(self, *exc):
+            return self._conn.__exit__(*exc)
+
+        def execute(self, sql, *params):
+            cursor = self._conn.execute(sql, *params)
+            if "MAX(id)" in sql:
+                other.start()
+                time.sleep(0.3)
+            return cursor
+
+    def flush_other():
+        with history.HistoryStore(db_path) as store:
+            store.add("other process", [], "h2")
+
+    other = threading.Thread(target=flush_other)
+
+    store = history.HistoryStore(db_path)
+    store.conn = RaceConnection(store.conn)
+    store.add("this process", [], "h1")
+    store.flush()
+    other.join()
+
+    with sqlite3.connect(str(db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0] == 2
+        # Fails if a row was indexed twice
+        conn.execute("INSERT INTO captures_fts (captures_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_search_is_fast_at_scale(tmp_path):
+    words = "invoice total amount due payment received order number customer".split()
+    rng = random.Random(0)
+    with history.HistoryStore(tmp_path / "history.db", batch_size=1000) as store:
+        for i in range(200_000):
+            store.add(" ".join(rng.choices(words, k=6)), [], f"h{i}")
+
+        for query in ("invoice", "invoice total"):
+            captures = store.search(query)
+            assert len(captures) == 20
+            assert captures[0].id > captures[-1].id
+
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                store.search(query)
+                timings.append(time.perf_counter() - start)
+            # Common words match most rows; ranking all of them took ~0.5 s
+            assert sorted(timings)[2] < 0.02, query
@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import pytest
+import rapidocr_onnxruntime
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import backend, languages
+
+
+@pytest.fixture
+def model(tmp_path):
+    path = tmp_path / "model.onnx"
+    path.write_bytes(b"onnx")
+    return path
+
+
+@pytest.mark.parametrize("script", ["", ".", "..", "a/b", "../evil", "default", "auto"])
+def test_install_rejects_invalid_names(tmp_path, model, script):
+    packs_dir = tmp_path / "packs" / "langpacks"
+    with pytest.raises(ValueError):
+        languages.install_language_pack(script, str(model), packs_dir=packs_dir)
+    assert not (packs_dir.parent / languages.MODEL_FILENAME).exists()
+
+
+def test_install_and_list(tmp_path, model):
+    packs_dir = tmp_path / "langpacks"
+    keys = tmp_path / "keys.txt"
+    keys.write_text("a\nb\n", encoding="utf-8")
+
+    pack_dir = languages.install_language_pack("devanagari", str(model), str(keys), packs_dir)
+
+    assert pack_dir == packs_dir / "devanagari"
+    assert (pack_dir / languages.MODEL_FILENAME).read_bytes() == b"onnx"
+    assert (pack_dir / languages.KEYS_FILENAME).is_file()
+    assert languages.list_language_packs(packs_dir) == ["devanagari"]
+
+
+def test_install_missing_model(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        languages.install_language_pack("latin", str(tmp_path / "missing.onnx"), packs_dir=tmp_path)
+
+
+@pytest.fixture(scope="module")
+def ocr_engine():
+    return RapidOCR()
+
+
+@pytest.fixture(scope="module")
+def detected(ocr_engine):
+    return backend.detect_text(backend.get_clean_image("images/test7.png"), ocr_engine)
+
+
+@pytest.fixture
+def packs_dir(tmp_path):
+    """The bundled recognizer installed as three packs of ~33 MB each."""
+    rec_model, = (Path(rapidocr_onnxruntime.__file__).parent / "models").glob("*rec*.onnx")
+    packs_dir = tmp_path / "langpacks"
+    for script in ("first", "second", "third"):
+        languages.install_language_pack(script, str(rec_model), packs_dir=packs_dir)
+    return packs_dir
+
+
+def test_lru_eviction(ocr_engine, packs_dir):
+    manager = languages.LanguageManager(ocr_engine, max_memory_mb=70, packs_dir=packs_dir)
+
+    assert manager.recognizer(languages.DEFAULT_SCRIPT) is ocr_engine.text_rec
+    first = manager.recognizer("first")
+    manager.recognizer("second")
+    assert manager.resident == ["first", "second"]
+
+    # A hit refreshes the pack; a third one evicts the least recently used
+    assert manager.recognizer("first") is first
+    manager.recognizer("third")
+    assert manager.resident == ["first", "third"]
+
+
+def test_use_restores_recognizer(ocr_engine, packs_dir):
+    manager = languages.LanguageManager(ocr_engine, packs_dir=packs_dir)
+    default = ocr_engine.text_rec
+
+    with pytest.raises(RuntimeError):
+        with manager.use("first"):
+            assert ocr_engine.text_rec is manager.recognizer("first")
+            with manager.use("second"):
+                assert ocr_engine.text_rec is manager.recognizer("second")
+            assert ocr_engine.text_rec is manager.recognizer("first")
+            raise RuntimeError("OCR failed")
+    assert ocr_engine.text_rec is default
+
+    with pytest.raises(FileNotFoundError):
+        with manager.use("missing"):
+            pass
+    assert ocr_engine.text_rec is default
+
+
+def test_detect_script_accepts_confident_default(ocr_engine, detected, packs_dir):
+    manager = languages.LanguageManager(ocr_engine, packs_dir=packs_dir)
+
+    assert manager.detect_script_from_text(detected) == languages.DEFAULT_SCRIPT
+    assert manager.resident == []
+
+    empty = backend.DetectedText(detected.boxes[:0], [])
+    assert manager.detect_script_from_text(empty) == languages.DEFAULT_SCRIPT
+
+
+def test_detect_script_picks_best(monkeypatch, ocr_engine, detected, packs_dir):
+    monkeypatch.setattr(languages, "DETECTION_ACCEPT_SCORE", 2.0)
+    manager = languages.LanguageManager(ocr_engine, packs_dir=packs_dir)
+
+    # Identical models tie, and ties go to the built-in recognizer
+    assert manager.detect_script_from_text(detected) == languages.DEFAULT_SCRIPT
+    assert manager.resident == ["first", "second", "third"]
+
+    def confident(crops):
+        rec_res, elapsed = recognizer(crops)
+        return [(res[0], 1.0) for res in rec_res], elapsed
+
+    recognizer = manager.recognizer("second")
+    manager._cache["second"] = confident
+    assert manager.detect_script_from_text(detected) == "second"
+
+
+def test_detect_script_never_evicts(monkeypatch, ocr_engine, detected, packs_dir):
+    monkeypatch.setattr(languages, "DETECTION_ACCEPT_SCORE", 2.0)
+    manager = languages.LanguageManager(ocr_engine, max_memory_mb=70, packs_dir=packs_dir)
+    manager.recognizer("third")
+
+    # The resident pack is probed; of the others, only one more fits
+    assert manager.detect_script_from_text(detected) == languages.DEFAULT_SCRIPT
+    assert manager.resident == ["third", "first"]
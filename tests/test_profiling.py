@@ -0,0 +1,83 @@
+import json
+import pstats
+import threading
+import time
+
+from text_extractor import profiling
+
+
+def test_disabled_span_is_a_no_op(tmp_path):
+    assert profiling.span("anything") is profiling._NULL_SPAN
+    assert profiling.thread("anything") is profiling._NULL_SPAN
+    assert profiling.request("req") is profiling._NULL_SPAN
+
+    with profiling.request("req"), profiling.span("outer"):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_nested_spans_and_output_files(tmp_path, capsys):
+    profiling.enable(str(tmp_path), use_cprofile=True)
+    try:
+        with profiling.request("req"):
+            # A nested request is recorded by the outer one
+            assert profiling.request("inner") is profiling._NULL_SPAN
+            with profiling.span("outer", items=3):
+                with profiling.span("inner"):
+                    time.sleep(0.02)
+    finally:
+        profiling.disable()
+
+    stems = {path.name.split(".", 1)[1] for path in tmp_path.iterdir()}
+    assert stems == {"trace.json", "collapsed", "prof"}
+
+    trace = json.loads(next(tmp_path.glob("*.trace.json")).read_text())
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert set(events) == {"req", "outer", "inner"}
+    assert events["outer"]["args"] == {"items": 3}
+    assert events["req"]["dur"] >= events["outer"]["dur"] >= events["inner"]["dur"] >= 20000
+
+    # Collapsed stacks hold self time: the sleep is counted once, in "inner"
+    collapsed = dict(
+        line.rsplit(" ", 1) for line in next(tmp_path.glob("*.collapsed")).read_text().splitlines()
+    )
+    assert set(collapsed) == {"req", "req;outer", "req;outer;inner"}
+    assert int(collapsed["req;outer;inner"]) >= 20000
+    assert int(collapsed["req;outer"]) < 20000
+
+    pstats.Stats(str(next(tmp_path.glob("*.prof"))))
+
+    # File paths are reported on stderr; stdout may carry a transcript
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err.count("Profile written to:") == 3
+
+
+def test_collapsed_stacks_and_trace(tmp_path):
+    profiling.enable(str(tmp_path))
+    try:
+        with profiling.request("req"):
+            with profiling.span("outer"):
+                with profiling.span("inner"):
+                    pass
+
+            def worker():
+                with profiling.thread("loader"), profiling.span("load"):
+                    pass
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            with profiling.span("wait"):
+                thread.join()
+    finally:
+        profiling.disable()
+
+    collapsed = next(tmp_path.glob("*.collapsed")).read_text().splitlines()
+    paths = {line.rsplit(" ", 1)[0] for line in collapsed}
+
+    # Helper thread spans nest under the request root, not as separate roots
+    assert paths == {
+        "req", "req;outer", "req;outer;inner", "req;wait",
+        "req;thread:loader", "req;thread:loader;load",
+    }
+    assert next(tmp_path.glob("*.trace.json")).stat().st_size > 0
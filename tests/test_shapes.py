@@ -0,0 +1,139 @@
+import random
+
+import numpy as np
+import pytest
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import shapes
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return RapidOCR()
+
+
+def detector_input(engine, height, width):
+    """Runs RapidOCR's own resize steps; returns (det_shape, rescaled)."""
+    image = np.zeros((height, width), dtype=np.uint8)
+    image, ratio_h, ratio_w = engine.preprocess(image)
+    image, op_record = engine.maybe_add_letterbox(image, {})
+    resized = engine.text_det.get_preprocess(max(image.shape[:2])).resize(image)
+    rescaled = (ratio_h, ratio_w) != (1.0, 1.0) or op_record["padding_1"]["top"] != 0
+    return resized.shape[:2], rescaled
+
+
+def bucket_shapes(engine):
+    det_short = engine.text_det.limit_side_len
+    buckets = set()
+    for ratio in shapes.DET_RATIO_BUCKETS:
+        det_long = shapes._det_long_side(det_short, ratio)
+        buckets |= {(det_short, det_long), (det_long, det_short)}
+    return buckets
+
+
+def test_padded_images_hit_a_bucket(engine):
+    rng = random.Random(0)
+    buckets = bucket_shapes(engine)
+    padded = 0
+
+    # Random selections on a 1080p screen
+    for _ in range(200):
+        height, width = rng.randint(20, 1080), rng.randint(20, 1920)
+        bucket_height, bucket_width = shapes.det_bucket_shape(height, width, engine)
+        if (bucket_height, bucket_width) == (height, width):
+            continue
+        padded += 1
+
+        # Only the long side grows, and RapidOCR maps the result onto a bucket
+        # without rescaling or letterboxing it
+        if height <= width:
+            assert bucket_height == height and bucket_width > width
+        else:
+            assert bucket_width == width and bucket_height > height
+        det_shape, rescaled = detector_input(engine, bucket_height, bucket_width)
+        assert det_shape in buckets
+        assert not rescaled
+
+        # Text scale: the short side maps to the same detector length
+        assert min(det_shape) == min(detector_input(engine, height, width)[0])
+
+    assert padded > 100
+
+
+@pytest.mark.parametrize("size", [(1080, 1920), (800, 1200), (1920, 1080)])
+def test_short_side_above_limit_is_not_padded(engine, size):
+    assert shapes.det_bucket_shape(*size, engine) == size
+
+
+def test_bucket_above_max_side_is_not_padded(engine):
+    # The 3.5 bucket (2576 detector pixels) needs 2100 image pixels at this
+    # short side, more than RapidOCR's max_side_len of 2000
+    assert shapes.det_bucket_shape(600, 1950, engine) == (600, 1950)
+    assert shapes.det_bucket_shape(1950, 600, engine) == (1950, 600)
+
+    # Used to be capped at 2000 and land on an arbitrary shape
+    bucket = shapes.det_bucket_shape(527, 1697, engine)
+    assert bucket[1] <= 2000
+    assert detector_input(engine, *bucket)[0] in bucket_shapes(engine)
+
+
+@pytest.mark.parametrize("size", [(20, 400), (100, 900), (3000, 400)])
+def test_images_rapidocr_rescales_are_not_padded(engine, size):
+    assert shapes.det_bucket_shape(*size, engine) == size
+
+
+def test_pad_to_bucket(engine):
+    image = np.zeros((300, 700), dtype=np.uint8)
+
+    padded = shapes.pad_to_bucket(image, engine)
+
+    assert padded.shape == shapes.det_bucket_shape(300, 700, engine)
+    assert padded.shape[1] > 700
+    assert not padded[:300, :700].any()
+    assert (padded[:, 700:] == 255).all()
+
+    bucketed = np.zeros(padded.shape, dtype=np.uint8)
+    assert shapes.pad_to_bucket(bucketed, engine) is bucketed
+
+
+def test_bucket_recognizer_widths():
+    calls = []
+
+    class Recognizer:
+        rec_image_shape = [3, 48, 320]
+
+        def resize_norm_img(self, img, max_wh_ratio):
+            calls.append(max_wh_ratio)
+
+    recognizer = Recognizer()
+    shapes.bucket_recognizer_widths(recognizer)
+    shapes.bucket_recognizer_widths(recognizer)
+
+    recognizer.resize_norm_img(None, 500 / 48)
+    recognizer.resize_norm_img(None, 5000 / 48)
+    assert calls == [640 / 48, 5000 / 48]
+
+
+def test_enable_shape_buckets(engine):
+    fresh = RapidOCR()
+    assert not shapes.is_enabled(fresh)
+
+    shapes.enable_shape_buckets(fresh)
+
+    assert shapes.is_enabled(fresh)
+    assert fresh.text_rec.resize_norm_img.bucketed
+
+
+def test_warm_up(engine):
+    assert shapes.warm_up(engine, max_det_shapes=1) == 1 + 4 + 1
+
+
+def test_stopped_warm_up(engine):
+    stop = shapes.StopSignal()
+    stop.set()
+
+    assert shapes.warm_up(engine, stop) == 0
+
+    # A run in flight sees the same flag and is cancelled
+    with pytest.raises(Exception, match="terminate"):
+        shapes._run(engine.text_det.infer, np.zeros((1, 3, 736, 736), np.float32), stop.run_options)
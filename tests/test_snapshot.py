@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import backend, snapshot
+
+
+@pytest.fixture(scope="module")
+def snapshot_dir(tmp_path_factory):
+    return snapshot.create_snapshot(tmp_path_factory.mktemp("cache") / "snapshot")
+
+
+def test_manifest_is_portable(snapshot_dir):
+    manifest = json.loads((snapshot_dir / snapshot.MANIFEST_FILENAME).read_text(encoding="utf-8"))
+
+    assert manifest["snapshot_version"] == snapshot.SNAPSHOT_VERSION
+    assert set(manifest["models"]) == set(snapshot.MODEL_SECTIONS)
+    for entry in manifest["models"].values():
+        assert (snapshot_dir / entry["file"]).is_file()
+
+
+def test_restored_engine_matches_fresh_engine(snapshot_dir):
+    engine, restored = snapshot.load_engine(snapshot_dir=snapshot_dir)
+    assert restored
+
+    expected = backend.extract_result_from_image("images/test7.png", RapidOCR())
+    actual = backend.extract_result_from_image("images/test7.png", engine)
+    assert actual.texts == expected.texts
+
+
+def test_missing_snapshot(tmp_path):
+    assert snapshot.load_snapshot(tmp_path / "missing") is None
+
+
+def test_load_engine_leaves_writing_to_the_caller(tmp_path):
+    engine, restored = snapshot.load_engine(snapshot_dir=tmp_path / "snapshot")
+
+    # Writing re-optimizes every model; it must not happen while loading
+    assert not restored
+    assert not (tmp_path / "snapshot").exists()
+
+
+def test_stale_snapshot(snapshot_dir, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_VERSION", snapshot.SNAPSHOT_VERSION + 1)
+
+    assert snapshot.load_snapshot(snapshot_dir) is None
@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+import pytest
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import video
+
+
+FPS = 10
+SLIDES = ["Hello world first slide", "Second slide with other text", "Third slide at noon"]
+SECONDS_PER_SLIDE = 2
+
+
+def render(text: str) -> np.ndarray:
+    frame = np.full((720, 1280, 3), 240, dtype=np.uint8)
+    for line, y in (("Static page header", 100), (text, 360)):
+        cv2.putText(frame, line, (60, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (30, 30, 30), 2)
+    return frame
+
+
+@pytest.fixture(scope="module")
+def slides_video(tmp_path_factory):
+    """A 1280x720 clip whose second text line changes every 2 seconds."""
+    path = tmp_path_factory.mktemp("video") / "slides.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, (1280, 720))
+    assert writer.isOpened()
+    for text in SLIDES:
+        frame = render(text)
+        for _ in range(FPS * SECONDS_PER_SLIDE):
+            writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def test_one_line_change_is_a_keyframe():
+    before = video.thumbnail(render(SLIDES[0]))
+    after = video.thumbnail(render(SLIDES[1]))
+    assert video.changed_pixels(before, after) >= video.DEFAULT_MIN_CHANGED_PIXELS
+
+    # A single changed digit still counts
+    clock = video.thumbnail(render("Clock 12:00"))
+    ticked = video.thumbnail(render("Clock 12:01"))
+    assert video.changed_pixels(clock, ticked) >= video.DEFAULT_MIN_CHANGED_PIXELS
+
+
+def test_iter_keyframes(slides_video):
+    timestamps = [timestamp for timestamp, _ in video.iter_keyframes(slides_video)]
+
+    # One keyframe per slide, then the end-of-video marker
+    assert timestamps == [0.0, 2.0, 4.0, 6.0]
+
+
+class VariableRateCapture:
+    """Replays (milliseconds, frame) pairs like OpenCV reading a VFR recording."""
+
+    def __init__(self, frames):
+        self._frames = iter(frames)
+        self._position = (0.0, None)
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self._position[0]
+        # The nominal rate in the header, which says little about VFR timing
+        return 30.0
+
+    def grab(self):
+        self._position = next(self._frames, (0.0, None))
+        return self._position[1] is not None
+
+    def retrieve(self):
+        return True, self._position[1]
+
+    def release(self):
+        pass
+
+
+def test_iter_keyframes_variable_frame_rate(monkeypatch):
+    first, second, third = (video.thumbnail(render(text)) for text in SLIDES)
+    # A static screen yields sparse frames, then a burst while it changes
+    frames = [(0.0, first), (1000.0, first), (2500.0, second), (2533.3, second),
+              (2566.7, second), (7000.0, third), (7100.0, third)]
+    monkeypatch.setattr(video.cv2, "VideoCapture", lambda path: VariableRateCapture(frames))
+
+    timestamps = [timestamp for timestamp, _ in video.iter_keyframes("screencast.webm")]
+
+    assert timestamps == [0.0, 2.5, 7.0, 7.2]
+
+
+def test_iter_keyframes_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(video.iter_keyframes(str(tmp_path / "missing.mp4")))
+
+
+def test_each_text_change_gets_a_segment(slides_video):
+    segments = video.ocr_video(slides_video, RapidOCR(), workers=2)
+
+    assert [(segment.start, segment.end) for segment in segments] == [
+        (0.0, 2.0), (2.0, 4.0), (4.0, 6.0)
+    ]
+    for segment, text in zip(segments, SLIDES):
+        assert text.replace(" ", "").lower() in segment.text.replace(" ", "").lower()
+
+
+def test_format_srt():
+    srt = video.format_srt([
+        video.TranscriptSegment(0.0, 2.5, "first"),
+        video.TranscriptSegment(2.5, 3661.0, "second"),
+    ])
+
+    assert srt == (
+        "1\n00:00:00,000 --> 00:00:02,500\nfirst\n\n"
+        "2\n00:00:02,500 --> 01:01:01,000\nsecond\n"
+    )
@@ -5,10 +5,81 @@ Handles image preprocessing and OCR using RapidOCR with ONNX runtime.
 Includes smart dark-mode detection and inversion for optimal OCR results.
 """
 
+import functools
+from itertools import chain, compress
+
 import cv2
 import numpy as np
 from rapidocr_onnxruntime import RapidOCR
-from typing import Tuple, Optional, List
+from typing import NamedTuple, Tuple, Optional, List, Sequence
+
+from importlib.metadata import version, PackageNotFoundError
+
+from text_extractor import profiling, shapes
+
+
+# A region of interest as (x, y, width, height) in full-image pixels
+Region = Tuple[int, int, int, int]
+
+# One recognised line: (4-point box in full-image coordinates, text, confidence)
+TextLine = Tuple[List[List[float]], str, float]
+
+# Stands in for the box of a result item that has none
+_NO_BOX = [[0.0, 0.0]] * 4
+
+
+class OCRResult(NamedTuple):
+    """
+    Columnar OCR output.
+    
+    Attributes:
+        boxes: (N, 4, 2) float32 array of box corners, or None when the
+            result was parsed without boxes
+        scores: (N,) float32 array of confidences
+        texts: List of N recognised strings
+    """
+    boxes: Optional[np.ndarray]
+    scores: np.ndarray
+    texts: List[str]
+    
+    @classmethod
+    def empty(cls, with_boxes: bool = True) -> "OCRResult":
+        boxes = np.zeros((0, 4, 2), dtype=np.float32) if with_boxes else None
+        return cls(boxes, np.zeros(0, dtype=np.float32), [])
+    
+    def filter(self, min_confidence: float) -> "OCRResult":
+        """Keeps only the lines whose confidence is at least min_confidence."""
+        keep = self.scores >= min_confidence
+        if keep.all():
+            return self
+        return OCRResult(
+            self.boxes[keep] if self.boxes is not None else None,
+            self.scores[keep],
+            list(compress(self.texts, keep.tolist()))
+        )
+    
+    def to_lines(self) -> List[TextLine]:
+        """
+        Converts to a list of (box, text, confidence) tuples.
+        
+        Raises:
+            ValueError: If the result was parsed without boxes
+        """
+        if self.boxes is None:
+            raise ValueError("OCRResult was parsed without boxes")
+        return list(zip(self.boxes.tolist(), self.texts, self.scores.tolist()))
+
+
+class DetectedText(NamedTuple):
+    """
+    Output of the detection stage, ready to be recognised.
+    
+    Attributes:
+        boxes: (N, 4, 2) float32 array of box corners, top-to-bottom
+        crops: N BGR crops of the boxes, in the same order
+    """
+    boxes: np.ndarray
+    crops: List[np.ndarray]
 
 
 def get_clean_image(image_path: str) -> np.ndarray:
@@ -25,10 +96,25 @@ def get_clean_image(image_path: str) -> np.ndarray:
     Raises:
         FileNotFoundError: If image cannot be read
     """
-    img = cv2.imread(str(image_path))
+    with profiling.span("backend.load_image"):
+        img = cv2.imread(str(image_path))
     if img is None:
         raise FileNotFoundError(f"Could not read image: {image_path}")
     
+    with profiling.span("backend.preprocess"):
+        return clean_image_array(img)
+
+
+def clean_image_array(img: np.ndarray) -> np.ndarray:
+    """
+    Applies the smart-invert heuristic to an already decoded BGR image.
+    
+    Args:
+        img: BGR numpy array (as returned by cv2.imread)
+        
+    Returns:
+        Grayscale numpy array optimized for OCR
+    """
     # Convert to grayscale
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     
@@ -86,42 +172,374 @@ def extract_text_conf(item) -> Tuple[Optional[str], Optional[float]]:
     return (str(item), None)
 
 
-def extract_text_from_image(image_path: str, ocr_engine: RapidOCR) -> Tuple[str, List[Tuple[str, float]]]:
+@functools.lru_cache(maxsize=None)
+def engine_version() -> str:
+    """Returns the installed RapidOCR version ("unknown" if undetectable)."""
+    try:
+        return version("rapidocr_onnxruntime")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def parse_ocr_result(
+    result,
+    with_boxes: bool = True,
+    min_confidence: Optional[float] = None
+) -> OCRResult:
+    """
+    Converts a RapidOCR result list into columnar arrays.
+    
+    Items are read with extract_text_conf(), so any result layout works.
+    Typical selections have only a handful of lines, where a plain loop
+    beats building and masking arrays (see benchmarks/bench_parsing.py),
+    so min_confidence is checked per item. OCRResult.filter() is the
+    vectorized filter for an already parsed result.
+    
+    Args:
+        result: Result list returned by a RapidOCR call
+        with_boxes: Build the boxes array; skipping it saves most of the
+            parsing time when only text is needed
+        min_confidence: If given, drop lines with lower confidence (same
+            as calling OCRResult.filter() on the result)
+        
+    Returns:
+        OCRResult in engine order
+    """
+    threshold = min_confidence if min_confidence is not None else float("-inf")
+    texts = []
+    scores = []
+    boxes = []
+    
+    for item in result or ():
+        text, confidence = extract_text_conf(item)
+        if text is None:
+            continue
+        confidence = confidence if confidence is not None else 0.0
+        if confidence < threshold:
+            continue
+        
+        texts.append(text)
+        scores.append(confidence)
+        if with_boxes:
+            box = item[0]
+            has_box = isinstance(box, (list, tuple, np.ndarray)) and len(box) == 4
+            boxes.append(box if has_box else _NO_BOX)
+    
+    if not texts:
+        return OCRResult.empty(with_boxes)
+    
+    box_array = None
+    if with_boxes:
+        # Flattening the nested lists is ~2x faster than np.asarray on them
+        coords = chain.from_iterable(chain.from_iterable(boxes))
+        box_array = np.fromiter(coords, dtype=np.float32, count=len(texts) * 8).reshape(-1, 4, 2)
+    
+    return OCRResult(box_array, np.asarray(scores, dtype=np.float32), texts)
+
+
+def extract_text_from_image(
+    image_path: str,
+    ocr_engine: RapidOCR,
+    min_confidence: float = 0.0
+) -> Tuple[str, List[Tuple[str, float]]]:
     """
     Extracts text from an image using the provided OCR engine.
     
     Args:
         image_path: Path to the image file
         ocr_engine: Initialized RapidOCR instance
+        min_confidence: Drop lines recognised with lower confidence
         
     Returns:
         Tuple of (joined_text, list_of_(text, confidence)_tuples)
         
+    Raises:
+        Exception: If OCR processing fails
+    """
+    result = extract_result_from_image(
+        image_path, ocr_engine, min_confidence, with_boxes=False
+    )
+    
+    # Join all text with newlines
+    full_text = '\n'.join(result.texts)
+    
+    return (full_text, list(zip(result.texts, result.scores.tolist())))
+
+
+def extract_result_from_image(
+    image_path: str,
+    ocr_engine: RapidOCR,
+    min_confidence: float = 0.0,
+    with_boxes: bool = True
+) -> OCRResult:
+    """
+    Runs OCR on an image and returns the columnar result.
+    
+    Args:
+        image_path: Path to the image file
+        ocr_engine: Initialized RapidOCR instance
+        min_confidence: Drop lines recognised with lower confidence
+        with_boxes: Also build the boxes array
+        
+    Returns:
+        OCRResult in reading order
+        
     Raises:
         Exception: If OCR processing fails
     """
     # Preprocess the image
     clean_image = get_clean_image(image_path)
     
+    return _run_ocr(clean_image, ocr_engine, min_confidence, with_boxes)
+
+
+def extract_result_from_array(
+    image: np.ndarray,
+    ocr_engine: RapidOCR,
+    min_confidence: float = 0.0,
+    with_boxes: bool = True
+) -> OCRResult:
+    """
+    Runs OCR on an already decoded BGR image (e.g. a video frame).
+    
+    Args:
+        image: BGR numpy array
+        ocr_engine: Initialized RapidOCR instance
+        min_confidence: Drop lines recognised with lower confidence
+        with_boxes: Also build the boxes array
+        
+    Returns:
+        OCRResult in reading order
+    """
+    with profiling.span("backend.preprocess"):
+        clean_image = clean_image_array(image)
+    
+    return _run_ocr(clean_image, ocr_engine, min_confidence, with_boxes)
+
+
+def _run_ocr(
+    clean_image: np.ndarray,
+    ocr_engine: RapidOCR,
+    min_confidence: float,
+    with_boxes: bool
+) -> OCRResult:
+    # Pad to a shape bucket so the detector sees a small set of input shapes
+    if shapes.is_enabled(ocr_engine):
+        clean_image = shapes.pad_to_bucket(clean_image, ocr_engine)
+    
     # Run OCR on the preprocessed image
-    result, elapsed = ocr_engine(clean_image)
+    with profiling.span("backend.ocr"):
+        result, elapsed = ocr_engine(clean_image)
     
-    if not result:
-        return ("", [])
+    with profiling.span("backend.parse_results", items=len(result or ())):
+        return parse_ocr_result(result, with_boxes, min_confidence)
+
+
+def extract_lines_from_image(
+    image_path: str,
+    ocr_engine: RapidOCR,
+    min_confidence: float = 0.0
+) -> List[TextLine]:
+    """
+    Extracts text lines, with their boxes, from an image.
     
-    # Extract text and confidence from results
-    text_lines = []
-    text_conf_pairs = []
+    Args:
+        image_path: Path to the image file
+        ocr_engine: Initialized RapidOCR instance
+        min_confidence: Drop lines recognised with lower confidence
+        
+    Returns:
+        List of (box, text, confidence) tuples in reading order
+        
+    Raises:
+        Exception: If OCR processing fails
+    """
+    return extract_result_from_image(image_path, ocr_engine, min_confidence).to_lines()
+
+
+def lines_to_text(lines: List[TextLine]) -> Tuple[str, List[Tuple[str, float]]]:
+    """
+    Joins text lines into the (text, pairs) form returned by extract_text_from_image.
     
-    for item in result:
-        text, confidence = extract_text_conf(item)
-        if text is None:
-            continue
-            
-        text_lines.append(text)
-        text_conf_pairs.append((text, confidence if confidence is not None else 0.0))
+    Args:
+        lines: List of (box, text, confidence) tuples
+        
+    Returns:
+        Tuple of (joined_text, list_of_(text, confidence)_tuples)
+    """
+    text_conf_pairs = [(text, confidence) for _, text, confidence in lines]
     
     # Join all text with newlines
-    full_text = '\n'.join(text_lines)
+    full_text = '\n'.join(text for text, _ in text_conf_pairs)
     
     return (full_text, text_conf_pairs)
+
+
+def region_views(image: np.ndarray, regions: Sequence[Region]) -> List[Tuple[Region, np.ndarray]]:
+    """
+    Slices regions of interest out of an image as zero-copy views.
+    
+    Regions are clipped to the image bounds; regions that end up empty
+    are dropped.
+    
+    Args:
+        image: Full image array
+        regions: Sequence of (x, y, width, height) rectangles
+        
+    Returns:
+        List of (clipped_region, view) pairs, in input order
+        
+    Raises:
+        ValueError: If a region does not have four components
+    """
+    height, width = image.shape[:2]
+    views = []
+    
+    for region in regions:
+        if len(region) != 4:
+            raise ValueError(f"Region must be (x, y, width, height), got: {region!r}")
+        
+        x, y, w, h = (int(v) for v in region)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, width), min(y + h, height)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        
+        # Basic slicing keeps this a view into the original buffer
+        views.append(((x0, y0, x1 - x0, y1 - y0), image[y0:y1, x0:x1]))
+    
+    return views
+
+
+def detect_text(clean_image: np.ndarray, ocr_engine: RapidOCR) -> DetectedText:
+    """
+    Runs only the detection stage and crops the detected text.
+    
+    Together with recognize_text() this lets detection run once while
+    recognition is repeated, e.g. with different language packs.
+    
+    Args:
+        clean_image: Preprocessed image (see get_clean_image)
+        ocr_engine: Initialized RapidOCR instance
+        
+    Returns:
+        DetectedText with boxes in the image's coordinates
+    """
+    if shapes.is_enabled(ocr_engine):
+        clean_image = shapes.pad_to_bucket(clean_image, ocr_engine)
+    
+    # The same stages as RapidOCR.__call__ up to detection. Calling the
+    # engine with use_rec=False would crop every box and then discard the
+    # crops, so each perspective warp would run twice.
+    img = ocr_engine.load_img(clean_image)
+    raw_h, raw_w = img.shape[:2]
+    img, ratio_h, ratio_w = ocr_engine.preprocess(img)
+    op_record = {"preprocess": {"ratio_h": ratio_h, "ratio_w": ratio_w}}
+    img, op_record = ocr_engine.maybe_add_letterbox(img, op_record)
+    
+    with profiling.span("backend.detect"):
+        det_boxes, _ = ocr_engine.auto_text_det(img)
+    if det_boxes is None:
+        return DetectedText(np.zeros((0, 4, 2), dtype=np.float32), [])
+    
+    crops = ocr_engine.get_crop_img_list(img, det_boxes)
+    boxes = ocr_engine._get_origin_points(det_boxes, op_record, raw_h, raw_w)
+    return DetectedText(boxes, crops)
+
+
+def recognize_text(
+    detected: DetectedText,
+    ocr_engine: RapidOCR,
+    min_confidence: float = 0.0
+) -> OCRResult:
+    """
+    Runs the classification and recognition stages on detected text.
+    
+    Uses whatever recognizer is currently installed on the engine, so it
+    can be called inside LanguageManager.use().
+    
+    Args:
+        detected: Output of detect_text()
+        ocr_engine: Initialized RapidOCR instance
+        min_confidence: Drop lines recognised with lower confidence
+        
+    Returns:
+        OCRResult in detection order, without empty recognitions
+    """
+    crops = detected.crops
+    if not crops:
+        return OCRResult.empty()
+    
+    # One classifier and recognizer pass over all crops
+    if ocr_engine.use_cls:
+        with profiling.span("backend.classify", crops=len(crops)):
+            crops, _, _ = ocr_engine.text_cls(crops)
+    with profiling.span("backend.recognize", crops=len(crops)):
+        rec_res, _ = ocr_engine.text_rec(crops)
+    
+    texts = [rec[0] for rec in rec_res]
+    result = OCRResult(
+        detected.boxes,
+        np.asarray([rec[1] for rec in rec_res], dtype=np.float32),
+        texts
+    )
+    
+    # Match the engine's own score filter, and drop empty recognitions
+    result = result.filter(max(min_confidence, ocr_engine.text_score))
+    keep = [bool(text) for text in result.texts]
+    if all(keep):
+        return result
+    return OCRResult(
+        result.boxes[keep],
+        result.scores[keep],
+        list(compress(result.texts, keep))
+    )
+
+
+def extract_lines_from_regions(
+    image_path: str,
+    regions: Sequence[Region],
+    ocr_engine: RapidOCR
+) -> List[TextLine]:
+    """
+    Extracts text only from the given regions of an image.
+    
+    The image is decoded and cleaned once. Text detection runs on each
+    region's view, then the crops from all regions are classified and
+    recognised together in one batch. Boxes are returned in full-image
+    coordinates.
+    
+    Args:
+        image_path: Path to the image file
+        regions: Sequence of (x, y, width, height) rectangles
+        ocr_engine: Initialized RapidOCR instance
+        
+    Returns:
+        List of (box, text, confidence) tuples, ordered by region and
+        then top-to-bottom within each region
+        
+    Raises:
+        FileNotFoundError: If image cannot be read
+        ValueError: If a region is malformed
+    """
+    clean_image = get_clean_image(image_path)
+    
+    boxes = []
+    crops = []
+    
+    for (x, y, _, _), view in region_views(clean_image, regions):
+        # Detection only; boxes come back in the view's own coordinates
+        with profiling.span("backend.region", region=[x, y, view.shape[1], view.shape[0]]):
+            detected = detect_text(view, ocr_engine)
+        if not detected.crops:
+            continue
+        
+        crops.extend(detected.crops)
+        boxes.append(detected.boxes + np.array([x, y], dtype=np.float32))
+    
+    if not crops:
+        return []
+    
+    # One classifier and recognizer pass over the crops of every region
+    detected = DetectedText(np.concatenate(boxes), crops)
+    return recognize_text(detected, ocr_engine).to_lines()
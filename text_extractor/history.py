@@ -0,0 +1,261 @@
+"""
+Capture History
+
+Optional local store of OCR results, indexed with SQLite FTS5 so past
+captures can be searched and re-copied without running OCR again.
+
+Each capture stores its text, the per-line boxes and confidences, a
+timestamp and the SHA-256 of the source image. Inserts are buffered and
+written in batches inside a single transaction; the full-text index is
+updated in the same transaction, so it never needs a rebuild.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from text_extractor.backend import TextLine
+
+
+HISTORY_PATH = Path(
+    os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share")
+) / "text-extractor" / "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    image_hash TEXT NOT NULL,
+    text TEXT NOT NULL,
+    lines TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS captures_image_hash ON captures (image_hash);
+"""
+
+# OCR output often glues words together ("Step2:TheTestImage"), so the
+# trigram tokenizer is used to match any substring of 3+ characters, like
+# grep would. Older SQLite (< 3.34) falls back to word-prefix matching.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS captures_fts USING fts5 (
+    text,
+    content='captures',
+    content_rowid='id',
+    tokenize='{tokenizer}'
+);
+"""
+
+
+class Capture(NamedTuple):
+    """A stored OCR result."""
+    id: int
+    created_at: float
+    image_hash: str
+    text: str
+    lines: List[TextLine]
+
+
+def hash_image(image_path: str) -> str:
+    """
+    Computes the SHA-256 of an image file.
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fts_query(query: str, prefix: bool) -> str:
+    # Quote every term so user input is matched literally (all terms
+    # required) instead of being parsed as FTS5 query syntax
+    suffix = "*" if prefix else ""
+    return " ".join(
+        '"' + term.replace('"', '""') + '"' + suffix for term in query.split()
+    )
+
+
+class HistoryStore:
+    """
+    Full-text indexed store of OCR results.
+
+    Use as a context manager so buffered captures are flushed on exit:
+
+        with HistoryStore() as store:
+            store.add(text, lines, image_hash)
+    """
+
+    def __init__(self, path: Path = HISTORY_PATH, batch_size: int = 64):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            batch_size: Number of buffered captures that triggers a write
+
+        Raises:
+            RuntimeError: If the SQLite library lacks FTS5 support
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.batch_size = batch_size
+        self._pending = []
+
+        self.conn = sqlite3.connect(str(path))
+        # WAL lets searches run while a batch is being written
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA.format(tokenizer="trigram"))
+        except sqlite3.OperationalError:
+            try:
+                self.conn.executescript(FTS_SCHEMA.format(tokenizer="unicode61"))
+            except sqlite3.OperationalError as e:
+                self.conn.close()
+                raise RuntimeError(f"SQLite FTS5 is not available: {e}") from e
+
+        table_sql = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'captures_fts'"
+        ).fetchone()[0]
+        self._substring_search = "trigram" in table_sql
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(
+        self,
+        text: str,
+        lines: List[TextLine],
+        image_hash: str,
+        created_at: Optional[float] = None
+    ) -> None:
+        """
+        Queues a capture for insertion.
+
+        Args:
+            text: Full extracted text
+            lines: (box, text, confidence) tuples for the capture
+            image_hash: SHA-256 of the source image
+            created_at: Unix timestamp (defaults to now)
+        """
+        self._pending.append((
+            created_at if created_at is not None else time.time(),
+            image_hash,
+            text,
+            json.dumps([[box, line_text, confidence] for box, line_text, confidence in lines]),
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes all queued captures and their index entries in one transaction."""
+        if not self._pending:
+            return
+
+        with self.conn:
+            # Take the write lock before reading the last id; otherwise another
+            # process could commit in between and get its rows indexed twice
+            self.conn.execute("BEGIN IMMEDIATE")
+            last_id = self.conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM captures"
+            ).fetchone()[0]
+
+            self.conn.executemany(
+                "INSERT INTO captures (created_at, image_hash, text, lines) "
+                "VALUES (?, ?, ?, ?)",
+                self._pending
+            )
+            # Index only the rows added by this batch
+            self.conn.execute(
+                "INSERT INTO captures_fts (rowid, text) "
+                "SELECT id, text FROM captures WHERE id > ?",
+                (last_id,)
+            )
+
+        self._pending = []
+
+    def search(self, query: str, limit: int = 20) -> List[Capture]:
+        """
+        Finds captures whose text contains all words of the query.
+
+        With the trigram index each word matches anywhere in the text but
+        must be at least 3 characters long; shorter words match nothing.
+
+        Args:
+            query: Words to look for
+            limit: Maximum number of results
+
+        Returns:
+            Matching captures, most recent first
+        """
+        self.flush()
+        if not query.split():
+            return []
+
+        # Ordering by rank would score every match before LIMIT applies;
+        # rowid order lets FTS5 stop after one page of ids
+        cursor = self.conn.execute(
+            "SELECT id, created_at, image_hash, text, lines FROM captures "
+            "WHERE id IN ("
+            "    SELECT rowid FROM captures_fts WHERE captures_fts MATCH ? "
+            "    ORDER BY rowid DESC LIMIT ?"
+            ") ORDER BY id DESC",
+            (_fts_query(query, prefix=not self._substring_search), limit)
+        )
+        return [self._to_capture(row) for row in cursor]
+
+    def get(self, capture_id: int) -> Optional[Capture]:
+        """
+        Looks up a capture by id.
+
+        Args:
+            capture_id: Id shown in search results
+
+        Returns:
+            The capture, or None if it does not exist
+        """
+        self.flush()
+        row = self.conn.execute(
+            "SELECT id, created_at, image_hash, text, lines FROM captures WHERE id = ?",
+            (capture_id,)
+        ).fetchone()
+        return self._to_capture(row) if row else None
+
+    def find_by_hash(self, image_hash: str) -> Optional[Capture]:
+        """
+        Returns the most recent capture of an identical image, if any.
+
+        Args:
+            image_hash: SHA-256 of the image
+        """
+        self.flush()
+        row = self.conn.execute(
+            "SELECT id, created_at, image_hash, text, lines FROM captures "
+            "WHERE image_hash = ? ORDER BY id DESC LIMIT 1",
+            (image_hash,)
+        ).fetchone()
+        return self._to_capture(row) if row else None
+
+    @staticmethod
+    def _to_capture(row) -> Capture:
+        lines = [tuple(line) for line in json.loads(row[4])]
+        return Capture(row[0], row[1], row[2], row[3], lines)
+
+    def close(self) -> None:
+        """Flushes queued captures and closes the database."""
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
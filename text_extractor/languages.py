@@ -0,0 +1,306 @@
+"""
+Language Packs
+
+Manages installable recognition models for additional scripts (Devanagari,
+Japanese, Korean, ...) and switches between them per request without
+reloading the text detector.
+
+A language pack is a directory under LANGPACK_DIR named after its script:
+
+    <LANGPACK_DIR>/<script>/rec.onnx   recognition model
+    <LANGPACK_DIR>/<script>/dict.txt   character dictionary (optional if
+                                       embedded in the model metadata)
+"""
+
+import os
+import shutil
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import backend, profiling, shapes
+
+
+# Name of the recognizer that ships with RapidOCR (Chinese + Latin)
+DEFAULT_SCRIPT = "default"
+
+# Pseudo-script that asks LanguageManager to pick a model automatically
+AUTO_SCRIPT = "auto"
+
+LANGPACK_DIR = Path(
+    os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share")
+) / "text-extractor" / "langpacks"
+
+MODEL_FILENAME = "rec.onnx"
+KEYS_FILENAME = "dict.txt"
+
+# ONNX Runtime keeps weights plus working buffers resident; this factor
+# turns a model's file size into a rough estimate of its memory footprint
+MEMORY_PER_MODEL_BYTE = 3
+
+# Number of text crops used to probe recognizers during script detection
+DETECTION_SAMPLE_SIZE = 4
+
+# Mean confidence at which script detection accepts a recognizer without
+# probing the remaining packs
+DETECTION_ACCEPT_SCORE = 0.9
+
+
+def install_language_pack(
+    script: str,
+    model_path: str,
+    keys_path: Optional[str] = None,
+    packs_dir: Path = LANGPACK_DIR
+) -> Path:
+    """
+    Installs a recognition model (and optional dictionary) as a language pack.
+
+    Args:
+        script: Name to install the pack under (e.g. "devanagari")
+        model_path: Path to the ONNX recognition model
+        keys_path: Path to the character dictionary, one character per line
+        packs_dir: Directory that holds the language packs
+
+    Returns:
+        Path of the installed pack directory
+
+    Raises:
+        ValueError: If the script name is reserved or not a plain name
+        FileNotFoundError: If the model or dictionary does not exist
+    """
+    # The name becomes a directory under packs_dir, so it must not be a path
+    reserved = (DEFAULT_SCRIPT, AUTO_SCRIPT, ".", "..")
+    if not script or script in reserved or Path(script).name != script:
+        raise ValueError(f"Invalid language pack name: {script!r}")
+
+    if not Path(model_path).is_file():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+    if keys_path is not None and not Path(keys_path).is_file():
+        raise FileNotFoundError(f"Dictionary not found: {keys_path}")
+
+    pack_dir = Path(packs_dir) / script
+    pack_dir.mkdir(parents=True, exist_ok=True)
+
+    shutil.copyfile(model_path, pack_dir / MODEL_FILENAME)
+    if keys_path is not None:
+        shutil.copyfile(keys_path, pack_dir / KEYS_FILENAME)
+
+    return pack_dir
+
+
+def list_language_packs(packs_dir: Path = LANGPACK_DIR) -> List[str]:
+    """
+    Lists installed language packs.
+
+    Args:
+        packs_dir: Directory that holds the language packs
+
+    Returns:
+        Sorted list of script names that have a recognition model installed
+    """
+    packs_dir = Path(packs_dir)
+    if not packs_dir.is_dir():
+        return []
+
+    return sorted(
+        entry.name for entry in packs_dir.iterdir()
+        if (entry / MODEL_FILENAME).is_file()
+    )
+
+
+class LanguageManager:
+    """
+    Keeps recognizers for several scripts resident next to one detector.
+
+    Recognizers are loaded on first use and kept in an LRU cache bounded by
+    an approximate memory budget. The engine's built-in recognizer is always
+    kept and never counts against the budget.
+    """
+
+    def __init__(
+        self,
+        ocr_engine: RapidOCR,
+        max_memory_mb: int = 256,
+        packs_dir: Path = LANGPACK_DIR
+    ):
+        """
+        Args:
+            ocr_engine: Initialized RapidOCR instance whose detector is shared
+            max_memory_mb: Approximate memory budget for extra recognizers
+            packs_dir: Directory that holds the language packs
+        """
+        self.ocr_engine = ocr_engine
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.packs_dir = Path(packs_dir)
+
+        self._default = ocr_engine.text_rec
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+
+    @property
+    def resident(self) -> List[str]:
+        """Scripts whose recognizers are currently loaded, least recent first."""
+        return list(self._cache)
+
+    def available(self) -> List[str]:
+        """Scripts that can be selected, including the built-in one."""
+        return [DEFAULT_SCRIPT] + list_language_packs(self.packs_dir)
+
+    def recognizer(self, script: str):
+        """
+        Returns the recognizer for a script, loading it if needed.
+
+        Args:
+            script: Language pack name, or DEFAULT_SCRIPT
+
+        Returns:
+            A RapidOCR text recognizer
+
+        Raises:
+            FileNotFoundError: If no language pack is installed for the script
+        """
+        if script == DEFAULT_SCRIPT:
+            return self._default
+
+        if script in self._cache:
+            self._cache.move_to_end(script)
+            return self._cache[script]
+
+        pack_dir = self.packs_dir / script
+        model_path = pack_dir / MODEL_FILENAME
+        if not model_path.is_file():
+            raise FileNotFoundError(f"Language pack not installed: {script}")
+
+        size = self._estimate_size(script)
+        self._evict(size)
+
+        with profiling.span("languages.load_recognizer", script=script):
+            recognizer = self._load(pack_dir)
+        self._cache[script] = recognizer
+        self._sizes[script] = size
+        return recognizer
+
+    def _estimate_size(self, script: str) -> int:
+        return (self.packs_dir / script / MODEL_FILENAME).stat().st_size * MEMORY_PER_MODEL_BYTE
+
+    def _fits(self, script: str) -> bool:
+        # Whether a pack can be loaded without evicting a resident one
+        return sum(self._sizes.values()) + self._estimate_size(script) <= self.max_memory
+
+    def _load(self, pack_dir: Path):
+        # Build the new recognizer with the same class and input geometry as
+        # the engine's own one, so it is a drop-in replacement
+        keys_path = pack_dir / KEYS_FILENAME
+        config = {
+            "model_path": str(pack_dir / MODEL_FILENAME),
+            "rec_keys_path": str(keys_path) if keys_path.is_file() else None,
+            "rec_img_shape": list(self._default.rec_image_shape),
+            "rec_batch_num": self._default.rec_batch_num,
+            "use_cuda": False,
+            "use_dml": False,
+            "intra_op_num_threads": -1,
+            "inter_op_num_threads": -1,
+        }
+        recognizer = type(self._default)(config)
+        if shapes.is_enabled(self.ocr_engine):
+            shapes.bucket_recognizer_widths(recognizer)
+        return recognizer
+
+    def _evict(self, incoming: int) -> None:
+        # Drop least recently used recognizers until the new one fits; a
+        # single oversized model is still loaded rather than refused
+        while self._cache and sum(self._sizes.values()) + incoming > self.max_memory:
+            script, _ = self._cache.popitem(last=False)
+            del self._sizes[script]
+
+    @contextmanager
+    def use(self, script: str) -> Iterator[None]:
+        """
+        Temporarily routes the engine's recognition through a script's model.
+
+        Only the recognizer is swapped; the detector and classifier stay as
+        they are.
+
+        Args:
+            script: Language pack name, or DEFAULT_SCRIPT
+        """
+        previous = self.ocr_engine.text_rec
+        self.ocr_engine.text_rec = self.recognizer(script)
+        try:
+            yield
+        finally:
+            self.ocr_engine.text_rec = previous
+
+    def detect_script(self, image: np.ndarray) -> str:
+        """
+        Picks the best recognizer for an image.
+
+        Runs detection, then calls detect_script_from_text(). Callers that
+        go on to recognise the same image should run backend.detect_text()
+        themselves and use detect_script_from_text(), so detection runs
+        only once.
+
+        Args:
+            image: Preprocessed image (see backend.get_clean_image)
+
+        Returns:
+            Script name (DEFAULT_SCRIPT if nothing better is found)
+        """
+        if len(self.available()) == 1:
+            return DEFAULT_SCRIPT
+        return self.detect_script_from_text(backend.detect_text(image, self.ocr_engine))
+
+    def detect_script_from_text(self, detected: "backend.DetectedText") -> str:
+        """
+        Picks the best recognizer for already detected text.
+
+        Recognises a few of the widest text crops with the built-in
+        recognizer, then with resident packs, then with packs that can be
+        loaded without evicting a resident one, and returns the one with
+        the highest mean confidence. Probing stops as soon as a recognizer
+        reaches DETECTION_ACCEPT_SCORE.
+
+        Each probe is one recognizer pass over DETECTION_SAMPLE_SIZE crops
+        (a few milliseconds); a pack that is not resident is loaded first,
+        which costs about as much as loading the engine's own recognizer.
+
+        Args:
+            detected: Output of backend.detect_text()
+
+        Returns:
+            Script name (DEFAULT_SCRIPT if nothing better is found)
+        """
+        scripts = self.available()
+        if len(scripts) == 1 or not detected.crops:
+            return DEFAULT_SCRIPT
+
+        with profiling.span("languages.detect_script"):
+            return self._detect_script(detected, scripts)
+
+    def _detect_script(self, detected: "backend.DetectedText", scripts: List[str]) -> str:
+        widths = detected.boxes[:, 1, 0] - detected.boxes[:, 0, 0]
+        widest = np.argsort(-widths, kind="stable")[:DETECTION_SAMPLE_SIZE]
+        crops = [detected.crops[i] for i in widest]
+
+        # Built-in and resident recognizers cost nothing to load; other
+        # packs are only loaded while they fit, so probing never evicts
+        resident = [script for script in reversed(self.resident) if script in scripts]
+        others = [script for script in scripts[1:] if script not in self._cache]
+
+        best_script = DEFAULT_SCRIPT
+        best_score = -1.0
+        for script in [DEFAULT_SCRIPT] + resident + others:
+            if script in others and not self._fits(script):
+                continue
+            rec_res, _ = self.recognizer(script)(crops)
+            score = float(np.mean([float(res[1]) for res in rec_res]))
+            if score > best_score:
+                best_script, best_score = script, score
+            if best_score >= DETECTION_ACCEPT_SCORE:
+                break
+
+        return best_script
@@ -9,26 +9,289 @@ This script coordinates the entire workflow:
 5. Notify user
 """
 
+import argparse
 import sys
 import os
 import tempfile
+import threading
 import time
+from concurrent.futures import Future
+from datetime import datetime
 from pathlib import Path
+from typing import Optional, Tuple
 
-from rapidocr_onnxruntime import RapidOCR
+from text_extractor import desktop, backend, history, languages, profiling, shapes, snapshot, video
 
-from text_extractor import desktop, backend
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parses command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="text-extractor",
+        description="Extract text from a screenshot (or an existing image) to the clipboard.",
+        epilog="Run 'text-extractor history --help' to search previous captures."
+    )
+    parser.add_argument(
+        "image", nargs="?",
+        help="use an existing image instead of capturing a screenshot"
+    )
+    parser.add_argument(
+        "--lang", default=languages.DEFAULT_SCRIPT, metavar="SCRIPT",
+        help="recognition language pack to use, or 'auto' to pick one "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--list-langs", action="store_true",
+        help="list installed language packs and exit"
+    )
+    parser.add_argument(
+        "--install-lang", nargs=2, metavar=("SCRIPT", "MODEL"),
+        help="install an ONNX recognition model as a language pack and exit"
+    )
+    parser.add_argument(
+        "--lang-dict", metavar="DICT",
+        help="character dictionary to install with --install-lang"
+    )
+    parser.add_argument(
+        "--profile", metavar="DIR",
+        help="write a Chrome trace and collapsed-stack profile of this run to DIR"
+    )
+    parser.add_argument(
+        "--cprofile", action="store_true",
+        help="with --profile, also record a cProfile .prof file"
+    )
+    parser.add_argument(
+        "--no-snapshot", action="store_true",
+        help="build the OCR engine from scratch instead of the warm-start snapshot"
+    )
+    parser.add_argument(
+        "--buckets", action="store_true",
+        help="pad images to a few pre-warmed input shapes for steadier latency "
+             "(results can differ slightly from unpadded OCR)"
+    )
+    parser.add_argument(
+        "--history", action="store_true",
+        help="save the result to the local searchable capture history"
+    )
+    
+    video_group = parser.add_argument_group("video")
+    video_group.add_argument(
+        "--video", metavar="FILE",
+        help="extract a time-coded transcript (SRT) from a screen recording"
+    )
+    video_group.add_argument(
+        "--interval", type=float, default=0.5, metavar="SECONDS",
+        help="time between sampled frames (default: %(default)s)"
+    )
+    video_group.add_argument(
+        "--workers", type=int, default=2,
+        help="number of frames OCR'd in parallel (default: %(default)s)"
+    )
+    video_group.add_argument(
+        "-o", "--output", metavar="FILE",
+        help="write the transcript to FILE instead of standard output"
+    )
+    return parser.parse_args(argv)
+
+
+def run_history(argv) -> int:
+    """
+    Runs the 'history' subcommand: search or re-copy previous captures.
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="text-extractor history",
+        description="Search and re-copy text from previous captures."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    search_parser = commands.add_parser("search", help="search captured text")
+    search_parser.add_argument("query", nargs="+", help="words to search for")
+    search_parser.add_argument("-n", "--limit", type=int, default=20, help="maximum results")
+    
+    copy_parser = commands.add_parser("copy", help="copy a previous capture to the clipboard")
+    copy_parser.add_argument("id", type=int, help="capture id from 'history search'")
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        store = history.HistoryStore()
+    except (RuntimeError, OSError) as e:
+        print(f"ERROR: Could not open capture history: {e}")
+        return 1
+    
+    with store:
+        if args.command == "search":
+            start_search = time.time()
+            captures = store.search(" ".join(args.query), limit=args.limit)
+            search_time = time.time() - start_search
+            
+            for capture in captures:
+                created = datetime.fromtimestamp(capture.created_at).strftime("%Y-%m-%d %H:%M")
+                preview = capture.text.replace("\n", " ")[:70]
+                print(f"{capture.id:>6}  {created}  {preview}")
+            print(f"\n{len(captures)} result(s) in {search_time * 1000:.1f} ms")
+            return 0
+        
+        capture = store.get(args.id)
+    
+    if capture is None:
+        print(f"ERROR: No capture with id {args.id}")
+        return 1
+    
+    if not desktop.copy_to_clipboard(capture.text):
+        print("ERROR: Failed to copy text to clipboard")
+        return 1
+    
+    print(f"✓ Copied {len(capture.text)} characters from capture {capture.id}")
+    desktop.send_notification(
+        "Text Extractor - Success",
+        f"Copied {len(capture.text)} characters from history",
+        urgency="normal"
+    )
+    return 0
 
 
 def main():
     """Main entry point for the text extractor v1."""
     
-    # Check for command line arguments (allow specifying existing image for testing)
-    import sys
+    if sys.argv[1:2] == ["history"]:
+        sys.exit(run_history(sys.argv[2:]))
+    
+    args = parse_args()
+    
+    if args.list_langs:
+        for script in [languages.DEFAULT_SCRIPT] + languages.list_language_packs():
+            print(script)
+        sys.exit(0)
     
-    if len(sys.argv) > 1:
+    if args.install_lang:
+        script, model_path = args.install_lang
+        try:
+            pack_dir = languages.install_language_pack(script, model_path, args.lang_dict)
+        except (ValueError, OSError) as e:
+            print(f"ERROR: Failed to install language pack: {e}")
+            sys.exit(1)
+        print(f"Installed language pack '{script}' to {pack_dir}")
+        sys.exit(0)
+    
+    if args.profile:
+        profiling.enable(args.profile, use_cprofile=args.cprofile)
+    
+    with profiling.request("text-extractor"):
+        if args.video:
+            run_video(args)
+        else:
+            run(args)
+
+
+def load_engine(args: argparse.Namespace, stop_warmup: Optional[shapes.StopSignal] = None):
+    """
+    Loads the OCR engine and, with --buckets, turns on shape bucketing.
+    
+    Args:
+        args: Parsed command line arguments
+        stop_warmup: If given, bucket shapes are warmed until it is set
+    
+    Returns:
+        Tuple of (engine, restored_from_snapshot)
+    """
+    with profiling.span("main.load_engine"):
+        ocr_engine, restored = snapshot.load_engine(use_snapshot=not args.no_snapshot)
+    
+    if args.buckets:
+        shapes.enable_shape_buckets(ocr_engine)
+        if stop_warmup is not None:
+            with profiling.span("main.warm_up"):
+                shapes.warm_up(ocr_engine, stop_warmup)
+    
+    return ocr_engine, restored
+
+
+def start_engine_loader(
+    args: argparse.Namespace,
+    stop_warmup: Optional[shapes.StopSignal] = None
+) -> Future:
+    """
+    Runs load_engine() on a daemon thread.
+    
+    A daemon thread never holds up the process exit, e.g. when the
+    screenshot is cancelled while the engine is still loading.
+    
+    Returns:
+        Future resolving to load_engine()'s result
+    """
+    future = Future()
+    
+    def load():
+        try:
+            with profiling.thread("engine-loader"):
+                future.set_result(load_engine(args, stop_warmup))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=load, name="engine-loader", daemon=True).start()
+    return future
+
+
+def save_snapshot(args: argparse.Namespace, restored: bool) -> None:
+    """
+    Writes the warm-start snapshot for the next run, unless the engine was
+    restored from a current one or --no-snapshot was given.
+    """
+    if args.no_snapshot or restored:
+        return
+    try:
+        with profiling.span("main.save_snapshot"):
+            snapshot.create_snapshot()
+    except Exception:
+        pass  # Next run simply tries again
+
+
+def run_video(args: argparse.Namespace) -> None:
+    """Transcribes the text shown in a video file."""
+    
+    print("Loading OCR engine...", file=sys.stderr)
+    try:
+        ocr_engine, restored = load_engine(args)
+    except Exception as e:
+        print(f"ERROR: Failed to load OCR engine: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"Extracting text from {args.video}...", file=sys.stderr)
+    start_ocr = time.time()
+    try:
+        segments = video.ocr_video(
+            args.video,
+            ocr_engine,
+            sample_interval=args.interval,
+            workers=max(1, args.workers)
+        )
+    except Exception as e:
+        print(f"ERROR: Video extraction failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    transcript = video.format_srt(segments)
+    if args.output:
+        Path(args.output).write_text(transcript, encoding="utf-8")
+    else:
+        print(transcript)
+    
+    print(
+        f"✓ {len(segments)} segment(s) in {time.time() - start_ocr:.2f} seconds",
+        file=sys.stderr
+    )
+    
+    save_snapshot(args, restored)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Runs the capture → OCR → clipboard workflow."""
+    
+    if args.image:
         # Use provided image file instead of screenshot
-        screenshot_path = sys.argv[1]
+        screenshot_path = args.image
         if not os.path.exists(screenshot_path):
             print(f"ERROR: File not found: {screenshot_path}")
             sys.exit(1)
@@ -41,6 +304,11 @@ def main():
         print("GNOME Text Extractor v1")
         print("=" * 40)
     
+    # Load (and warm) the engine in the background while the user is
+    # selecting the area; the selection usually takes longer than both
+    stop_warmup = shapes.StopSignal()
+    engine_future = start_engine_loader(args, None if skip_screenshot else stop_warmup)
+    
     if not skip_screenshot:
         # Step 1: Capture screenshot
         print("\n[1/4] Capturing screenshot...")
@@ -50,7 +318,9 @@ def main():
         temp_dir = tempfile.gettempdir()
         screenshot_path = os.path.join(temp_dir, 'text-extractor-screenshot.png')
         
-        success, error_msg = desktop.capture_screenshot(screenshot_path)
+        with profiling.span("main.capture_screenshot"):
+            success, error_msg = desktop.capture_screenshot(screenshot_path)
+        stop_warmup.set()
         if not success:
             print(f"ERROR: {error_msg}")
             desktop.send_notification(
@@ -65,14 +335,117 @@ def main():
         print("\n[1/4] Skipping screenshot (using provided image)")
 
     
-    # Step 2: Load OCR engine (this is the "cold start" part)
+    # An identical image was OCR'd before: reuse its text instead
+    image_hash = None
+    cached = None
+    if args.history and args.lang == languages.DEFAULT_SCRIPT:
+        image_hash, cached = find_in_history(screenshot_path)
+    
+    if cached is not None:
+        print(f"\n[2/4] Identical image found in capture history (#{cached.id})")
+        print("\n[3/4] Skipping OCR")
+        extracted_text = cached.text
+    else:
+        extracted_text = extract_text(args, engine_future, screenshot_path, image_hash)
+    
+    # Step 4: Copy to clipboard
+    print("\n[4/4] Copying text to clipboard...")
+    
+    with profiling.span("main.copy_to_clipboard"):
+        copied = desktop.copy_to_clipboard(extracted_text)
+    
+    if copied:
+        print("      ✓ Text copied to clipboard")
+        
+        # Show preview (first 100 chars)
+        preview = extracted_text[:100]
+        if len(extracted_text) > 100:
+            preview += "..."
+        print(f"\n--- Extracted Text Preview ---")
+        print(preview)
+        print("=" * 40)
+        
+        # Send success notification
+        desktop.send_notification(
+            "Text Extractor - Success",
+            f"Extracted {len(extracted_text)} characters\nText copied to clipboard!",
+            urgency="normal"
+        )
+    else:
+        print("ERROR: Failed to copy text to clipboard")
+        desktop.send_notification(
+            "Text Extractor - Error",
+            "Failed to copy text to clipboard",
+            urgency="critical"
+        )
+        sys.exit(1)
+    
+    if cached is None:
+        # Only now that the text is on the clipboard, so building the
+        # snapshot never lengthens a first run's capture
+        save_snapshot(args, engine_future.result()[1])
+    
+    # Cleanup (only if we created the screenshot)
+    if not skip_screenshot:
+        try:
+            os.remove(screenshot_path)
+        except Exception:
+            pass  # Ignore cleanup errors
+    
+    print("\n✓ Done!")
+
+
+def find_in_history(screenshot_path: str) -> Tuple[Optional[str], Optional[history.Capture]]:
+    """
+    Looks up an earlier capture of an identical image.
+    
+    Args:
+        screenshot_path: Image about to be OCR'd
+    
+    Returns:
+        Tuple of (image_hash, capture or None); both are None if the
+        history cannot be read
+    """
+    try:
+        with profiling.span("main.find_in_history"), history.HistoryStore() as store:
+            image_hash = history.hash_image(screenshot_path)
+            return image_hash, store.find_by_hash(image_hash)
+    except Exception as e:
+        print(f"      ⚠ Could not read capture history: {e}")
+        return None, None
+
+
+def extract_text(
+    args: argparse.Namespace,
+    engine_future: Future,
+    screenshot_path: str,
+    image_hash: Optional[str] = None
+) -> str:
+    """
+    Waits for the engine, runs OCR and, with --history, saves the result.
+    
+    Exits the process if the engine fails to load, OCR fails or no text
+    is found.
+    
+    Args:
+        args: Parsed command line arguments
+        engine_future: Future from start_engine_loader()
+        screenshot_path: Image to OCR
+        image_hash: SHA-256 of the image, if already computed
+    
+    Returns:
+        The extracted text
+    """
+    # Step 2: Wait for the OCR engine (this is the "cold start" part)
     print("\n[2/4] Loading OCR engine...")
     start_load = time.time()
     
     try:
-        ocr_engine = RapidOCR()
+        with profiling.span("main.wait_for_engine"):
+            ocr_engine, restored = engine_future.result()
         load_time = time.time() - start_load
-        print(f"      ✓ Engine loaded in {load_time:.2f} seconds")
+        source = "restored from snapshot" if restored else "built from scratch"
+        print(f"      ✓ Engine ready after {load_time:.2f} seconds ({source})")
     except Exception as e:
         print(f"ERROR: Failed to load OCR engine: {e}")
         desktop.send_notification(
@@ -87,10 +460,27 @@ def main():
     start_ocr = time.time()
     
     try:
-        extracted_text, text_conf_pairs = backend.extract_text_from_image(
-            screenshot_path,
-            ocr_engine
-        )
+        language_manager = languages.LanguageManager(ocr_engine)
+        if args.lang == languages.AUTO_SCRIPT:
+            # Detect once; the crops serve both script detection and recognition
+            with profiling.span("main.extract_text"):
+                detected = backend.detect_text(
+                    backend.get_clean_image(screenshot_path),
+                    ocr_engine
+                )
+                script = language_manager.detect_script_from_text(detected)
+                with language_manager.use(script):
+                    result = backend.recognize_text(detected, ocr_engine)
+            print(f"      ✓ Detected script: {script}")
+        else:
+            with language_manager.use(args.lang), profiling.span("main.extract_text"):
+                # Boxes are only needed for the capture history
+                result = backend.extract_result_from_image(
+                    screenshot_path,
+                    ocr_engine,
+                    with_boxes=args.history
+                )
+        extracted_text = '\n'.join(result.texts)
         ocr_time = time.time() - start_ocr
         print(f"      ✓ OCR completed in {ocr_time:.2f} seconds")
         
@@ -103,7 +493,7 @@ def main():
             )
             sys.exit(0)
             
-        print(f"      ✓ Extracted {len(text_conf_pairs)} text segment(s)")
+        print(f"      ✓ Extracted {len(result.texts)} text segment(s)")
         
     except Exception as e:
         print(f"ERROR: Text extraction failed: {e}")
@@ -114,43 +504,17 @@ def main():
         )
         sys.exit(1)
     
-    # Step 4: Copy to clipboard
-    print("\n[4/4] Copying text to clipboard...")
-    
-    if desktop.copy_to_clipboard(extracted_text):
-        print("      ✓ Text copied to clipboard")
-        
-        # Show preview (first 100 chars)
-        preview = extracted_text[:100]
-        if len(extracted_text) > 100:
-            preview += "..."
-        print(f"\n--- Extracted Text Preview ---")
-        print(preview)
-        print("=" * 40)
-        
-        # Send success notification
-        desktop.send_notification(
-            "Text Extractor - Success",
-            f"Extracted {len(extracted_text)} characters\nText copied to clipboard!",
-            urgency="normal"
-        )
-    else:
-        print("ERROR: Failed to copy text to clipboard")
-        desktop.send_notification(
-            "Text Extractor - Error",
-            "Failed to copy text to clipboard",
-            urgency="critical"
-        )
-        sys.exit(1)
-    
-    # Cleanup (only if we created the screenshot)
-    if not skip_screenshot:
+    if args.history:
         try:
-            os.remove(screenshot_path)
-        except Exception:
-            pass  # Ignore cleanup errors
+            with profiling.span("main.save_history"), history.HistoryStore() as store:
+                image_hash = image_hash or history.hash_image(screenshot_path)
+                store.add(extracted_text, result.to_lines(), image_hash)
+            print("      ✓ Saved to capture history")
+        except Exception as e:
+            # History is a convenience; never fail the capture because of it
+            print(f"      ⚠ Could not save to capture history: {e}")
     
-    print("\n✓ Done!")
+    return extracted_text
 
 
 if __name__ == "__main__":
@@ -0,0 +1,272 @@
+"""
+Profiling Hooks
+
+Records nested timing spans for each request and writes them out as:
+
+- Chrome trace JSON (open in chrome://tracing or https://ui.perfetto.dev)
+- collapsed stacks ("a;b;c <microseconds>"), the input format of
+  flamegraph.pl, speedscope and inferno
+- optionally a cProfile .prof file (snakeviz, pstats)
+
+Profiling is off by default. It is switched on with enable() (the CLI's
+--profile flag) or by setting TEXT_EXTRACTOR_PROFILE to an output
+directory, which lets a long-running process be profiled without code
+changes. While disabled, span() and request() return a shared no-op
+context manager, so instrumented code pays only a global lookup.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+ENV_VAR = "TEXT_EXTRACTOR_PROFILE"
+
+
+class _NullSpan:
+    """Reusable context manager that does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Collects the spans of a single request.
+    """
+
+    def __init__(self, name: str, use_cprofile: bool = False):
+        """
+        Args:
+            name: Request name, used for the trace's root span and file names
+            use_cprofile: Also run cProfile for the duration of the request
+        """
+        self.name = name
+        self.events: List[Dict] = []
+        self.stacks: Dict[Tuple[str, ...], float] = {}
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+        self._thread_profiles: List[cProfile.Profile] = []
+
+    def _stack(self) -> List[List]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        """
+        Times a block of code as a span nested inside the current one.
+
+        Args:
+            name: Span name, e.g. "backend.ocr"
+            **args: Extra values stored with the span in the trace
+        """
+        stack = self._stack()
+        # Each frame is [name, accumulated child time]
+        frame = [name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            prefix = getattr(self._local, "prefix", ())
+            path = prefix + tuple(entry[0] for entry in stack)
+            stack.pop()
+            if stack:
+                stack[-1][1] += duration
+
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+            self_time = max(duration - frame[1], 0.0)
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+
+    @contextmanager
+    def thread(self, name: str) -> Iterator[None]:
+        """
+        Records a helper thread's spans as part of this request.
+
+        Spans opened inside the block are nested under the request's root
+        as "thread:<name>" in the collapsed stacks, rather than being
+        counted as separate roots, and the thread gets its own track in
+        the trace. With cProfile, the thread is profiled too.
+
+        Args:
+            name: Thread name shown in the trace
+        """
+        self._local.prefix = (self.name,)
+        self.events.append({
+            "name": "thread_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"name": name},
+        })
+
+        profile = None
+        if self._cprofile is not None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ profiles every thread from the request's profiler
+                profile = None
+
+        try:
+            with self.span(f"thread:{name}"):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._thread_profiles.append(profile)
+
+    def start(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def write(self, output_dir: Path) -> List[Path]:
+        """
+        Writes the collected trace files.
+
+        Args:
+            output_dir: Directory to write into (created if missing)
+
+        Returns:
+            Paths of the files written
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+        trace_path = output_dir / f"{stem}.trace.json"
+        with open(trace_path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+        collapsed_path = output_dir / f"{stem}.collapsed"
+        with open(collapsed_path, "w") as f:
+            for path, seconds in sorted(self.stacks.items()):
+                f.write(f"{';'.join(path)} {int(round(seconds * 1e6))}\n")
+
+        written = [trace_path, collapsed_path]
+        if self._cprofile is not None:
+            prof_path = output_dir / f"{stem}.prof"
+            if self._thread_profiles:
+                stats = pstats.Stats(self._cprofile)
+                for profile in self._thread_profiles:
+                    stats.add(profile)
+                stats.dump_stats(str(prof_path))
+            else:
+                self._cprofile.dump_stats(str(prof_path))
+            written.append(prof_path)
+
+        return written
+
+
+_output_dir: Optional[Path] = None
+_use_cprofile = False
+_active: Optional[Profiler] = None
+
+
+def enable(output_dir: str, use_cprofile: bool = False) -> None:
+    """
+    Turns profiling on for subsequent requests.
+
+    Args:
+        output_dir: Directory that receives the trace files
+        use_cprofile: Also record a cProfile profile per request
+    """
+    global _output_dir, _use_cprofile
+    _output_dir = Path(output_dir)
+    _use_cprofile = use_cprofile
+
+
+def disable() -> None:
+    """Turns profiling off for subsequent requests."""
+    global _output_dir
+    _output_dir = None
+
+
+def is_enabled() -> bool:
+    return _output_dir is not None
+
+
+def span(name: str, **args):
+    """
+    Times a block as a span of the current request.
+
+    Returns a no-op context manager when no request is being profiled.
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _active.span(name, **args)
+
+
+def thread(name: str):
+    """
+    Records the current (helper) thread's spans as part of the request.
+
+    Returns a no-op context manager when no request is being profiled.
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _active.thread(name)
+
+
+def request(name: str):
+    """
+    Profiles one request; trace files are written when the block exits.
+
+    Returns a no-op context manager when profiling is disabled or another
+    request is already being profiled (the outer one records the spans).
+    """
+    if _output_dir is None or _active is not None:
+        return _NULL_SPAN
+    return _profile_request(name, _output_dir)
+
+
+@contextmanager
+def _profile_request(name: str, output_dir: Path) -> Iterator[None]:
+    global _active
+    profiler = Profiler(name, use_cprofile=_use_cprofile)
+    _active = profiler
+    profiler.start()
+    try:
+        with profiler.span(name):
+            yield
+    finally:
+        profiler.stop()
+        _active = None
+        # stderr, so a transcript written to stdout (--video) stays clean
+        for path in profiler.write(output_dir):
+            print(f"      Profile written to: {path}", file=sys.stderr)
+
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
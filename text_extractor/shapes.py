@@ -0,0 +1,287 @@
+"""
+Inference Shape Bucketing
+
+ONNX Runtime pays an extra cost the first time a model sees a new input
+shape. Screenshots come in arbitrary sizes, so without help almost every
+capture hits that slow path. This module keeps the set of shapes small:
+
+- Detection: RapidOCR scales an image's short side up to a fixed length
+  (736 by default) when it is shorter than that, which covers most
+  selections. Such images are padded (with background) on their long
+  side only, up to the next aspect-ratio bucket, so each bucket maps to
+  one detector input shape and the text scale stays the same. Images that
+  RapidOCR would not scale this way (a short side of 736 or more, very
+  wide or very small images) are left as they are.
+- Recognition: each batch's width is rounded up to a width bucket
+  instead of the widest crop in the batch.
+
+warm_up() runs the models once per common bucket so those shapes are
+ready before the first real request.
+
+Padding moves detected boxes by a few pixels, which can change line
+splits, spacing or the occasional character, so bucketing is opt-in.
+"""
+
+import math
+import threading
+import weakref
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+from rapidocr_onnxruntime import RapidOCR
+
+
+# Long side / short side ratios the detector input is padded up to; a
+# wide image above RapidOCR's width/height limit (8) would be letterboxed
+DET_RATIO_BUCKETS = (1.0, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0, 7.5)
+
+# Recognition batch widths, in pixels at the model's input height
+REC_WIDTH_BUCKETS = (320, 480, 640, 960, 1280, 1920, 2560)
+
+# Ratio buckets warmed, most common screenshot selections first (wide
+# text areas, then tall panels). The widest shapes come last: a cold
+# 736x5536 detector run alone takes seconds, and StopSignal cancels it
+# rather than waiting when the selection ends.
+WARMUP_ORDER = (
+    (2.0, False), (3.0, False), (1.5, False), (4.0, False), (1.0, False),
+    (2.5, False), (1.25, False), (5.0, False), (1.5, True), (2.0, True),
+    (1.75, False), (3.0, True), (1.25, True), (3.5, False), (6.0, False),
+    (7.5, False),
+)
+
+_bucketed_engines = weakref.WeakSet()
+
+
+class StopSignal:
+    """
+    Stops a warm_up() running on another thread.
+
+    Works like a threading.Event, and setting it also cancels the model
+    call in flight, so stopping never waits for a slow shape to finish.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.run_options = ort.RunOptions()
+
+    def set(self) -> None:
+        self._event.set()
+        self.run_options.terminate = True
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+
+def _det_resized(length: int, scale: float) -> int:
+    # RapidOCR's detector resize: scale, truncate, round to a multiple of 32
+    return int(round(int(length * scale) / 32) * 32)
+
+
+def _det_long_side(det_short: int, ratio: float) -> int:
+    # Long side of the detector input for a ratio bucket (multiple of 32)
+    return max(32, int(round(det_short * ratio / 32)) * 32)
+
+
+def det_bucket_shape(height: int, width: int, ocr_engine: RapidOCR) -> Tuple[int, int]:
+    """
+    Computes the padded size of an image for the detector.
+
+    Only the long side is ever padded. The image is returned unchanged if
+    RapidOCR does not scale its short side up to the detector limit, or if
+    the padded image would exceed max_side_len or be letterboxed, since
+    RapidOCR would then rescale it and the input shape would be arbitrary
+    anyway.
+
+    Args:
+        height: Image height
+        width: Image width
+        ocr_engine: Initialized RapidOCR instance
+
+    Returns:
+        (padded_height, padded_width), never smaller than the input
+    """
+    limit_side_len = int(getattr(ocr_engine.text_det, "limit_side_len", None) or 736)
+    max_side_len = getattr(ocr_engine, "max_side_len", 2000)
+    min_height = max(getattr(ocr_engine, "min_height", 30), getattr(ocr_engine, "min_side_len", 30))
+    width_height_ratio = getattr(ocr_engine, "width_height_ratio", 8)
+
+    short, long = sorted((height, width))
+    if short <= min_height or short >= limit_side_len or long > max_side_len:
+        return height, width
+
+    # Same float RapidOCR computes, so _det_resized matches it exactly
+    scale = float(limit_side_len) / short
+    det_long = _det_resized(long, scale)
+    det_short = _det_resized(short, scale)
+
+    for ratio in DET_RATIO_BUCKETS:
+        bucket = _det_long_side(det_short, ratio)
+        if bucket >= det_long:
+            break
+    else:
+        return height, width
+
+    # Smallest image length the detector resizes onto the bucket
+    padded = max(long, math.ceil((bucket - 16) / scale) - 1)
+    while _det_resized(padded, scale) < bucket:
+        padded += 1
+
+    if padded > max_side_len or _det_resized(padded, scale) != bucket:
+        return height, width
+    if height <= width and width_height_ratio != -1 and padded / height > width_height_ratio:
+        return height, width
+
+    if height <= width:
+        return height, padded
+    return padded, width
+
+
+def pad_to_bucket(image: np.ndarray, ocr_engine: RapidOCR) -> np.ndarray:
+    """
+    Pads a black-on-white image at the bottom/right to its detector bucket.
+
+    Padding only extends the canvas, so box coordinates stay valid for the
+    original image.
+
+    Args:
+        image: Cleaned (black-on-white) grayscale image
+        ocr_engine: Initialized RapidOCR instance
+
+    Returns:
+        The padded image, or the input itself if it already fits a bucket
+    """
+    height, width = image.shape[:2]
+    bucket_height, bucket_width = det_bucket_shape(height, width, ocr_engine)
+    if (bucket_height, bucket_width) == (height, width):
+        return image
+
+    return cv2.copyMakeBorder(
+        image, 0, bucket_height - height, 0, bucket_width - width,
+        cv2.BORDER_CONSTANT, value=255
+    )
+
+
+def bucket_recognizer_widths(recognizer) -> None:
+    """
+    Rounds a recognizer's batch widths up to REC_WIDTH_BUCKETS.
+
+    Args:
+        recognizer: RapidOCR text recognizer (left unchanged if it does not
+            expose the expected resize hook)
+    """
+    resize_norm_img = getattr(recognizer, "resize_norm_img", None)
+    if resize_norm_img is None or getattr(resize_norm_img, "bucketed", False):
+        return
+
+    img_height = recognizer.rec_image_shape[1]
+
+    def bucketed_resize_norm_img(img: np.ndarray, max_wh_ratio: float) -> np.ndarray:
+        width = img_height * max_wh_ratio
+        bucket = next((w for w in REC_WIDTH_BUCKETS if w >= width), None)
+        if bucket is not None:
+            max_wh_ratio = bucket / img_height
+        return resize_norm_img(img, max_wh_ratio)
+
+    bucketed_resize_norm_img.bucketed = True
+    recognizer.resize_norm_img = bucketed_resize_norm_img
+
+
+def enable_shape_buckets(ocr_engine: RapidOCR) -> None:
+    """
+    Turns on detector padding and recognizer width bucketing for an engine.
+
+    Args:
+        ocr_engine: Initialized RapidOCR instance
+    """
+    bucket_recognizer_widths(ocr_engine.text_rec)
+    _bucketed_engines.add(ocr_engine)
+
+
+def is_enabled(ocr_engine: RapidOCR) -> bool:
+    return ocr_engine in _bucketed_engines
+
+
+def warmup_shapes(ocr_engine: RapidOCR) -> List[Tuple[int, int]]:
+    """
+    Lists detector input shapes to warm, most common first.
+
+    Args:
+        ocr_engine: Initialized RapidOCR instance
+
+    Returns:
+        List of (height, width) detector input shapes
+    """
+    limit_side_len = int(getattr(ocr_engine.text_det, "limit_side_len", None) or 736)
+    det_short = int(round(limit_side_len / 32)) * 32
+    shapes = []
+    for ratio, portrait in WARMUP_ORDER:
+        det_long = _det_long_side(det_short, ratio)
+        shape = (det_long, det_short) if portrait else (det_short, det_long)
+        if shape not in shapes:
+            shapes.append(shape)
+    return shapes
+
+
+def _run(infer_session, inputs: np.ndarray, run_options: Optional[ort.RunOptions]) -> None:
+    # Calls the ONNX Runtime session under RapidOCR's wrapper directly, so
+    # the run can be cancelled through run_options
+    session = infer_session.session
+    session.run(None, {session.get_inputs()[0].name: inputs}, run_options)
+
+
+def warm_up(
+    ocr_engine: RapidOCR,
+    stop_signal: Optional[StopSignal] = None,
+    max_det_shapes: Optional[int] = None
+) -> int:
+    """
+    Runs each model once on the common bucket shapes.
+
+    The classifier and recognizer widths are cheap and warmed first; then
+    detector shapes follow in WARMUP_ORDER until stop_signal is set.
+
+    Args:
+        ocr_engine: Initialized RapidOCR instance
+        stop_signal: Stops warming, cancelling the model call in flight,
+            when set
+        max_det_shapes: Maximum number of detector shapes to warm
+
+    Returns:
+        Number of shapes warmed
+    """
+    run_options = stop_signal.run_options if stop_signal is not None else None
+    jobs = []
+
+    cls = getattr(ocr_engine.text_cls, "infer", None)
+    cls_shape = getattr(ocr_engine.text_cls, "cls_image_shape", None)
+    if cls is not None and cls_shape is not None:
+        batch = getattr(ocr_engine.text_cls, "cls_batch_num", 1)
+        jobs.append((cls, (batch, *cls_shape)))
+
+    rec = getattr(ocr_engine.text_rec, "session", None)
+    if rec is not None:
+        channels, img_height, _ = ocr_engine.text_rec.rec_image_shape
+        batch = ocr_engine.text_rec.rec_batch_num
+        for width in REC_WIDTH_BUCKETS[:4]:
+            jobs.append((rec, (batch, channels, img_height, width)))
+
+    det = getattr(ocr_engine.text_det, "infer", None)
+    if det is not None:
+        for height, width in warmup_shapes(ocr_engine)[:max_det_shapes]:
+            jobs.append((det, (1, 3, height, width)))
+
+    warmed = 0
+    for infer_session, shape in jobs:
+        if stop_signal is not None and stop_signal.is_set():
+            break
+        try:
+            _run(infer_session, np.zeros(shape, dtype=np.float32), run_options)
+        except Exception:
+            if stop_signal is not None and stop_signal.is_set():
+                break  # Cancelled mid-run
+            raise
+        warmed += 1
+
+    return warmed
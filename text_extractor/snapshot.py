@@ -0,0 +1,227 @@
+"""
+Warm-Start Snapshot
+
+Persists the expensive parts of engine initialization so the one-shot
+command starts faster on later runs:
+
+- ONNX Runtime's hardware-independent graph optimizations are applied
+  once and the optimized detection, classification and recognition
+  graphs are saved, so later sessions load graphs that are already fused
+- the recognizer's character dictionary is extracted to a plain file
+
+A manifest records the snapshot format, package versions, the machine
+architecture and the SHA-256 of every source model. Optimized graphs can
+contain hardware-specific kernels, so a snapshot that does not match the
+current environment is treated as stale and rebuilt.
+
+Snapshots are saved at ORT_ENABLE_EXTENDED, as ONNX Runtime recommends for
+offline optimization: ORT_ENABLE_ALL adds layout transformations for the
+current CPU's instruction set, which would break a snapshot in a home
+directory shared with a different machine of the same architecture. Those
+are still applied when the snapshot is loaded.
+
+Per-shape buffers that ONNX Runtime allocates during the first inference
+cannot be serialized; they are only created by running the model.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import onnxruntime as ort
+import rapidocr_onnxruntime
+from rapidocr_onnxruntime import RapidOCR
+from rapidocr_onnxruntime.utils import read_yaml
+
+from text_extractor import __version__, backend
+
+
+SNAPSHOT_VERSION = 2
+
+SNAPSHOT_DIR = Path(
+    os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+) / "text-extractor" / "snapshot"
+
+MANIFEST_FILENAME = "manifest.json"
+KEYS_FILENAME = "dict.txt"
+
+# Config sections of RapidOCR's config.yaml that hold a model
+MODEL_SECTIONS = ("Det", "Cls", "Rec")
+
+
+def source_models() -> Dict[str, Path]:
+    """
+    Locates the ONNX models RapidOCR loads by default.
+
+    Returns:
+        Mapping of config section ("Det", "Cls", "Rec") to model path
+    """
+    package_dir = Path(rapidocr_onnxruntime.__file__).resolve().parent
+    config = read_yaml(package_dir / "config.yaml")
+    return {section: package_dir / config[section]["model_path"] for section in MODEL_SECTIONS}
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _environment() -> Dict[str, object]:
+    return {
+        "snapshot_version": SNAPSHOT_VERSION,
+        "text_extractor": __version__,
+        "rapidocr": backend.engine_version(),
+        "onnxruntime": ort.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def create_snapshot(snapshot_dir: Path = SNAPSHOT_DIR) -> Path:
+    """
+    Builds a snapshot of the default models.
+
+    The manifest is written last, so an interrupted build is never
+    mistaken for a valid snapshot.
+
+    Args:
+        snapshot_dir: Directory to write the snapshot into (replaced)
+
+    Returns:
+        Path of the snapshot directory
+    """
+    snapshot_dir = Path(snapshot_dir)
+    if snapshot_dir.exists():
+        shutil.rmtree(snapshot_dir)
+    snapshot_dir.mkdir(parents=True)
+
+    models = {}
+    for section, source in source_models().items():
+        target = snapshot_dir / source.name
+
+        # Portable optimizations only; see the module docstring
+        options = ort.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        options.optimized_model_filepath = str(target)
+        session = ort.InferenceSession(
+            str(source), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        if section == "Rec":
+            metadata = session.get_modelmeta().custom_metadata_map
+            if "character" in metadata:
+                (snapshot_dir / KEYS_FILENAME).write_text(metadata["character"], encoding="utf-8")
+
+        stat = source.stat()
+        models[section] = {
+            "source": str(source),
+            "file": target.name,
+            "sha256": _sha256(source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    manifest = dict(_environment(), models=models)
+    tmp_path = snapshot_dir / (MANIFEST_FILENAME + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp_path.replace(snapshot_dir / MANIFEST_FILENAME)
+
+    return snapshot_dir
+
+
+def _is_current(manifest: Dict, snapshot_dir: Path) -> bool:
+    for key, value in _environment().items():
+        if manifest.get(key) != value:
+            return False
+
+    sources = source_models()
+    models = manifest.get("models", {})
+    if set(models) != set(sources):
+        return False
+
+    for section, source in sources.items():
+        entry = models[section]
+        if entry["source"] != str(source) or not (snapshot_dir / entry["file"]).is_file():
+            return False
+        try:
+            stat = source.stat()
+        except OSError:
+            return False
+        # Only re-hash when the file looks different from when it was snapshotted
+        if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+            if _sha256(source) != entry["sha256"]:
+                return False
+
+    return True
+
+
+def load_snapshot(snapshot_dir: Path = SNAPSHOT_DIR) -> Optional[RapidOCR]:
+    """
+    Creates an engine from a snapshot, if a current one exists.
+
+    Args:
+        snapshot_dir: Snapshot directory
+
+    Returns:
+        Initialized RapidOCR instance, or None if the snapshot is missing
+        or stale
+    """
+    snapshot_dir = Path(snapshot_dir)
+    try:
+        manifest = json.loads((snapshot_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if not _is_current(manifest, snapshot_dir):
+        return None
+
+    models = manifest["models"]
+    kwargs = {
+        "det_model_path": str(snapshot_dir / models["Det"]["file"]),
+        "cls_model_path": str(snapshot_dir / models["Cls"]["file"]),
+        "rec_model_path": str(snapshot_dir / models["Rec"]["file"]),
+    }
+    keys_path = snapshot_dir / KEYS_FILENAME
+    if keys_path.is_file():
+        kwargs["rec_keys_path"] = str(keys_path)
+
+    return RapidOCR(**kwargs)
+
+
+def load_engine(
+    use_snapshot: bool = True,
+    snapshot_dir: Path = SNAPSHOT_DIR
+) -> Tuple[RapidOCR, bool]:
+    """
+    Loads the OCR engine, restoring from a snapshot when possible.
+
+    When no current snapshot exists, the engine is built normally. Writing
+    a snapshot re-optimizes every model, so it is left to the caller: call
+    create_snapshot() once the result no longer waits on it. Snapshot
+    failures never prevent the engine from loading.
+
+    Args:
+        use_snapshot: Set to False to always build the engine from scratch
+        snapshot_dir: Snapshot directory
+
+    Returns:
+        Tuple of (engine, restored_from_snapshot)
+    """
+    if not use_snapshot:
+        return RapidOCR(), False
+
+    try:
+        engine = load_snapshot(snapshot_dir)
+    except Exception:
+        engine = None
+    if engine is not None:
+        return engine, True
+
+    return RapidOCR(), False
@@ -0,0 +1,249 @@
+"""
+Video OCR
+
+Extracts a time-coded transcript from screen recordings.
+
+Frames are decoded one at a time with OpenCV and sampled at a fixed
+interval of their presentation timestamps, so variable-frame-rate
+recordings (such as GNOME's WebM screencasts) keep accurate times. A
+small grayscale thumbnail of each sample is compared with the last
+keyframe's, and only frames where enough thumbnail pixels changed are
+OCR'd, on a small thread pool. The thumbnail is large enough that
+replacing one line of text, or even one digit, registers as a change.
+Consecutive keyframes whose text stays the same are merged into a single
+transcript segment.
+
+Memory use is bounded by the number of frames in flight, not by the
+length of the video.
+"""
+
+import difflib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+from rapidocr_onnxruntime import RapidOCR
+
+from text_extractor import backend, profiling
+
+
+# Width of the grayscale thumbnails frames are compared at; at 320 pixels
+# a single changed digit of 720p screen text still covers ~25 pixels
+THUMBNAIL_WIDTH = 320
+
+# A thumbnail pixel counts as changed when its brightness moves by more
+# than this (0-255); absorbs video compression noise
+PIXEL_THRESHOLD = 32
+
+# Samples with fewer changed thumbnail pixels than this are treated as
+# duplicates of the last keyframe
+DEFAULT_MIN_CHANGED_PIXELS = 8
+
+# Texts at least this similar (difflib ratio) count as unchanged; absorbs
+# OCR jitter between frames of the same content
+DEFAULT_SIMILARITY = 0.9
+
+
+class TranscriptSegment(NamedTuple):
+    """Text visible on screen between two timestamps (in seconds)."""
+    start: float
+    end: float
+    text: str
+
+
+def thumbnail(frame: np.ndarray, width: int = THUMBNAIL_WIDTH) -> np.ndarray:
+    """
+    Downscales a frame to a grayscale thumbnail for change detection.
+
+    Args:
+        frame: BGR or grayscale image
+        width: Thumbnail width; the height keeps the frame's aspect ratio
+
+    Returns:
+        uint8 grayscale thumbnail
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    height = max(1, int(round(frame.shape[0] * width / frame.shape[1])))
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def changed_pixels(a: np.ndarray, b: np.ndarray, threshold: int = PIXEL_THRESHOLD) -> int:
+    """Counts pixels whose brightness differs by more than threshold."""
+    return int(np.count_nonzero(cv2.absdiff(a, b) > threshold))
+
+
+def iter_keyframes(
+    video_path: str,
+    sample_interval: float = 0.5,
+    min_changed_pixels: int = DEFAULT_MIN_CHANGED_PIXELS
+) -> Iterator[Tuple[float, Optional[np.ndarray]]]:
+    """
+    Streams visually distinct frames from a video.
+
+    Args:
+        video_path: Path to the video file
+        sample_interval: Seconds between sampled frames
+        min_changed_pixels: Samples with fewer changed thumbnail pixels
+            than this (compared with the last keyframe) are skipped
+
+    Yields:
+        (timestamp_seconds, bgr_frame) for each keyframe, then a final
+        (duration_seconds, None) marking the end of the video
+
+    Raises:
+        FileNotFoundError: If the video cannot be opened
+    """
+    capture = cv2.VideoCapture(str(video_path))
+    if not capture.isOpened():
+        raise FileNotFoundError(f"Could not open video: {video_path}")
+
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        interval_ms = sample_interval * 1000
+        next_sample_ms = 0.0
+        last_thumbnail = None
+        last_ms = previous_ms = None
+
+        # grab() advances without converting the frame; only sampled
+        # frames pay for retrieve()
+        while capture.grab():
+            # Screen recordings are often variable frame rate, so frame
+            # times come from the container, not from index / fps
+            frame_ms = round(capture.get(cv2.CAP_PROP_POS_MSEC))
+            previous_ms, last_ms = last_ms, frame_ms
+            if frame_ms < next_sample_ms:
+                continue
+            while next_sample_ms <= frame_ms:
+                next_sample_ms += interval_ms
+
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            small = thumbnail(frame)
+            if (last_thumbnail is None or small.shape != last_thumbnail.shape
+                    or changed_pixels(small, last_thumbnail) >= min_changed_pixels):
+                last_thumbnail = small
+                yield frame_ms / 1000, frame
+
+        # Let callers close the final segment at the end of the video; the
+        # last frame is assumed to last as long as the one before it
+        if last_ms is None:
+            end_ms = 0
+        elif previous_ms is not None:
+            end_ms = 2 * last_ms - previous_ms
+        else:
+            end_ms = last_ms + (round(1000 / fps) if fps > 0 else 0)
+        yield end_ms / 1000, None
+    finally:
+        capture.release()
+
+
+def _same_text(a: str, b: str, similarity: float) -> bool:
+    if a == b:
+        return True
+    return difflib.SequenceMatcher(None, a, b).ratio() >= similarity
+
+
+def ocr_video(
+    video_path: str,
+    ocr_engine: RapidOCR,
+    sample_interval: float = 0.5,
+    workers: int = 2,
+    min_changed_pixels: int = DEFAULT_MIN_CHANGED_PIXELS,
+    similarity: float = DEFAULT_SIMILARITY
+) -> List[TranscriptSegment]:
+    """
+    Builds a transcript of the text shown in a video.
+
+    Keyframes are OCR'd concurrently on one shared engine (ONNX Runtime
+    sessions are safe to run from several threads). At most 2 * workers
+    frames are held in memory at any time.
+
+    Args:
+        video_path: Path to the video file
+        ocr_engine: Initialized RapidOCR instance
+        sample_interval: Seconds between sampled frames
+        workers: Number of OCR threads
+        min_changed_pixels: Keyframe deduplication threshold (see iter_keyframes)
+        similarity: Minimum text similarity to extend the current segment
+
+    Returns:
+        Transcript segments in time order; frames without text are omitted
+
+    Raises:
+        FileNotFoundError: If the video cannot be opened
+    """
+    segments: List[TranscriptSegment] = []
+    current: Optional[TranscriptSegment] = None
+
+    def ocr_frame(frame: np.ndarray) -> str:
+        # Pool threads: nest their spans under the request's root
+        with profiling.thread("video-ocr"), profiling.span("video.ocr_frame"):
+            result = backend.extract_result_from_array(frame, ocr_engine, with_boxes=False)
+        return "\n".join(result.texts)
+
+    def close_segment(end: float) -> None:
+        nonlocal current
+        if current is not None:
+            segments.append(current._replace(end=end))
+            current = None
+
+    def consume(timestamp: float, text: str) -> None:
+        nonlocal current
+        if current is not None and _same_text(current.text, text, similarity):
+            return
+        close_segment(timestamp)
+        if text:
+            current = TranscriptSegment(timestamp, timestamp, text)
+
+    end_time = 0.0
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for timestamp, frame in iter_keyframes(video_path, sample_interval, min_changed_pixels):
+            if frame is None:
+                end_time = timestamp
+                continue
+            pending.append((timestamp, pool.submit(ocr_frame, frame)))
+
+            # Keep results in order and memory bounded
+            while len(pending) >= workers * 2:
+                done_time, future = pending.popleft()
+                consume(done_time, future.result())
+
+        while pending:
+            done_time, future = pending.popleft()
+            consume(done_time, future.result())
+
+    close_segment(end_time)
+    return segments
+
+
+def _format_timestamp(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def format_srt(segments: List[TranscriptSegment]) -> str:
+    """
+    Formats transcript segments as SubRip (.srt) text.
+
+    Args:
+        segments: Transcript segments in time order
+
+    Returns:
+        SRT document
+    """
+    blocks = []
+    for number, segment in enumerate(segments, start=1):
+        blocks.append(
+            f"{number}\n"
+            f"{_format_timestamp(segment.start)} --> {_format_timestamp(segment.end)}\n"
+            f"{segment.text}\n"
+        )
+    return "\n".join(blocks)